@@ -0,0 +1,125 @@
+from collections import OrderedDict, deque
+import asyncio
+
+
+class QueueFull(Exception):
+    """
+    Raised when a request cannot be queued because the queue (or the
+    requesting user's share of it) is full.
+    """
+
+
+class AdmissionQueue:
+    """
+    STACK: Admission control
+    Bounded-concurrency gate for an expensive command.
+
+    - At most `concurrency` jobs run at once; the rest wait in a queue.
+    - Waiting jobs are dispatched round-robin across guilds, then across
+      users within a guild, so one noisy user cannot starve everyone else.
+    - Requests with the same key while one is queued or running share its
+      result instead of doing the work again.
+
+    Args:
+        name: Queue name, used in logs.
+        concurrency: Maximum jobs running at once.
+        max_queue: Maximum jobs waiting across all users.
+        per_user: Maximum jobs a single user may have waiting.
+    """
+
+    def __init__(self, name, concurrency, max_queue, per_user=2):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.per_user = per_user
+
+        self._running = 0
+        self._queued = 0
+        # guild id -> user id -> deque of jobs, both in round-robin order
+        self._lanes = OrderedDict()
+        self._inflight = {}
+
+    @property
+    def queued(self):
+        return self._queued
+
+    async def submit(self, key, guild_id, user_id, work, on_queued=None):
+        """
+        Run `work()` once admitted and return its result.
+
+        Args:
+            key: Coalescing key, or None to never coalesce.
+            guild_id: Guild the request came from (None for DMs).
+            user_id: User who made the request.
+            work: Zero-argument coroutine function doing the actual work.
+            on_queued: Optional async callback, called with the 1-based queue
+                position when the job has to wait.
+
+        Raises:
+            QueueFull: If the job cannot be queued.
+        """
+        if key is not None and key in self._inflight:
+            return await asyncio.shield(self._inflight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        job = (key, work, future)
+
+        if self._running < self.concurrency and self._queued == 0:
+            self._track(key, future)
+            self._start(job)
+        else:
+            users = self._lanes.get(guild_id, {})
+            if self._queued >= self.max_queue:
+                raise QueueFull(f"{self.name} queue is full")
+            if len(users.get(user_id, ())) >= self.per_user:
+                raise QueueFull(f"too many {self.name} requests queued")
+
+            self._track(key, future)
+            self._lanes.setdefault(guild_id, OrderedDict()).setdefault(
+                user_id, deque()
+            ).append(job)
+            self._queued += 1
+            print(f"[ADMISSION] {self.name}: queued #{self._queued}")
+            if on_queued:
+                await on_queued(self._queued)
+
+        return await asyncio.shield(future)
+
+    def _track(self, key, future):
+        if key is not None:
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+    def _start(self, job):
+        self._running += 1
+        asyncio.get_running_loop().create_task(self._run(job))
+
+    async def _run(self, job):
+        _, work, future = job
+        try:
+            future.set_result(await work())
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            self._running -= 1
+            self._dispatch()
+
+    def _dispatch(self):
+        while self._running < self.concurrency and self._queued:
+            self._start(self._next())
+
+    def _next(self):
+        guild_id, users = next(iter(self._lanes.items()))
+        user_id, jobs = next(iter(users.items()))
+        job = jobs.popleft()
+        self._queued -= 1
+
+        if jobs:
+            users.move_to_end(user_id)
+        else:
+            del users[user_id]
+        if users:
+            self._lanes.move_to_end(guild_id)
+        else:
+            del self._lanes[guild_id]
+        return job
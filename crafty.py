@@ -0,0 +1,117 @@
+from dotenv import load_dotenv
+import yaml
+
+import aiohttp
+import asyncio
+import os
+
+load_dotenv()
+with open(os.getenv("CONFIG_PATH", "config.yaml"), "r") as f:
+    config = yaml.safe_load(f)
+
+CRAFTY_URL = config["crafty"].get("API_URL", "https://pesu-mc.ddns.net:8443")
+CRAFTY_TOKEN = os.getenv("CRAFTY_TOKEN")
+
+REQUEST_TIMEOUT_SECONDS = 5
+
+_session = None
+
+
+def get_session():
+    """
+    STACK: Crafty API
+    Shared, lazily created HTTP session for the Crafty API. Reusing it keeps
+    the TLS connection to Crafty alive between the 10 s polls.
+
+    Returns:
+        aiohttp.ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            base_url=CRAFTY_URL,
+            headers={
+                "Authorization": f"{CRAFTY_TOKEN}",
+                "Content-Type": "application/json",
+            },
+            connector=aiohttp.TCPConnector(ssl=False, limit=8),
+            timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT_SECONDS),
+        )
+    return _session
+
+
+async def close_session():
+    """
+    STACK: Crafty API
+    Close the shared session, if it was opened.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+async def get_server_stats(server_id):
+    """
+    STACK: Crafty API
+    Fetch a server's live stats from Crafty in one call.
+
+    Args:
+        server_id: Crafty server id.
+
+    Returns:
+        dict | None: {"running", "online", "max", "players", "cpu", "mem",
+        "mem_percent"}, or None if Crafty could not be reached.
+    """
+    try:
+        async with get_session().get(f"/api/v2/servers/{server_id}/stats") as resp:
+            if resp.status != 200:
+                print(f"[CRAFTY] Stats request failed: {resp.status}")
+                return None
+            body = await resp.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        print(f"[CRAFTY] Stats request failed: {type(e).__name__}")
+        return None
+    except ValueError:
+        # 200 with a non-JSON body, e.g. a proxy error page.
+        print("[CRAFTY] Stats response was not JSON")
+        return None
+
+    try:
+        data = body.get("data") or {}
+        players = data.get("players") or []
+        if isinstance(players, str):
+            # Older Crafty builds return the player list as a stringified list.
+            players = [
+                p.strip(" '\"") for p in players.strip("[]").split(",") if p.strip()
+            ]
+
+        return {
+            "running": bool(data.get("running")),
+            "online": int(data.get("online") or 0),
+            "max": int(data.get("max") or 0),
+            "players": players,
+            "cpu": float(data.get("cpu") or 0),
+            "mem": data.get("mem"),
+            "mem_percent": float(data.get("mem_percent") or 0),
+        }
+    except (AttributeError, TypeError, ValueError):
+        print("[CRAFTY] Stats response had an unexpected shape")
+        return None
+
+
+async def server_action(server_id, action):
+    """
+    STACK: Crafty API
+    Send a power action (`start_server`, `stop_server`, ...) to a server.
+
+    Args:
+        server_id: Crafty server id.
+        action: Crafty action name.
+    """
+    url = f"/api/v2/servers/{server_id}/action/{action}"
+    async with get_session().post(url) as resp:
+        text = await resp.text()
+        print(f"[CRAFTY] {action} Response {resp.status}: {text}")
+        if resp.status != 200:
+            raise Exception(f"[CRAFTY] Failed to {action}: {resp.status}")
@@ -0,0 +1,165 @@
+from collections import deque
+from datetime import timedelta
+
+from stats.activity import UTC_OFFSET
+
+# Samples further apart than this split history into separate VM sessions.
+SESSION_GAP_SECONDS = 60
+
+
+class IdlePolicy:
+    """
+    STACK: Server control
+    Decides when an empty server should be shut down, combining:
+
+    - a base idle duration, overridable per time-of-day window
+    - an extension while recent joins suggest players are coming back
+    - a hold while CPU is busy (saves, world generation), capped at
+      `CPU_BUSY_MAX_MINUTES` past the idle limit
+    - hysteresis: a player who stays less than `RESET_SECONDS` does not
+      reset the idle timer
+
+    The policy is pure: state lives in a dict from `new_state`, so the same
+    code drives the live loop and historical replays.
+
+    Args:
+        cfg: Settings, as in `utils.IDLE_POLICY`.
+    """
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+
+    @staticmethod
+    def new_state():
+        return {"empty_time": None, "present_since": None, "join_samples": deque()}
+
+    def idle_limit(self, now, state):
+        """
+        Idle seconds allowed at `now` (naive UTC) before shutting down.
+        """
+        minutes = self.cfg["IDLE_MINUTES"]
+        hour = (now + UTC_OFFSET).hour
+        for window in self.cfg["WINDOWS"]:
+            start, end = window["HOURS"]
+            inside = start <= hour < end if start <= end else hour >= start or hour < end
+            if inside:
+                minutes = window["IDLE_MINUTES"]
+                break
+
+        threshold = self.cfg["JOIN_THRESHOLD"]
+        if threshold is not None and self.recent_joins(state) >= threshold:
+            minutes += self.cfg["JOIN_EXTEND_MINUTES"]
+        return minutes * 60
+
+    def recent_joins(self, state):
+        samples = state["join_samples"]
+        if len(samples) < 2:
+            return 0
+        return samples[-1][1] - samples[0][1]
+
+    def evaluate(self, state, now, players, cpu=None, total_joins=None):
+        """
+        Update `state` with one observation and decide whether to shut down.
+
+        Args:
+            state: Dict from `new_state`.
+            now: Naive UTC time of the observation.
+            players: Players online.
+            cpu: System CPU percent, if known.
+            total_joins: Lifetime join counter, if known.
+
+        Returns:
+            tuple: (shut down?, idle seconds so far)
+        """
+        if total_joins is not None:
+            samples = state["join_samples"]
+            samples.append((now, total_joins))
+            horizon = now - timedelta(minutes=self.cfg["JOIN_WINDOW_MINUTES"])
+            while samples and samples[0][0] < horizon:
+                samples.popleft()
+
+        if players > 0:
+            if state["present_since"] is None:
+                state["present_since"] = now
+            stayed = (now - state["present_since"]).total_seconds()
+            if stayed >= self.cfg["RESET_SECONDS"]:
+                state["empty_time"] = None
+            return False, 0.0
+
+        state["present_since"] = None
+        if state["empty_time"] is None:
+            state["empty_time"] = now
+        idle = (now - state["empty_time"]).total_seconds()
+
+        limit = self.idle_limit(now, state)
+        busy = self.cfg["CPU_BUSY_PCT"]
+        if busy is not None and cpu is not None and cpu >= busy:
+            # An empty server stuck at high CPU is still billed, so the hold
+            # only lasts so long.
+            if idle < limit + self.cfg["CPU_BUSY_MAX_MINUTES"] * 60:
+                return False, idle
+
+        return idle >= limit, idle
+
+
+def replay(policy, docs):
+    """
+    STACK: Server control
+    Dry-run a policy over historical `server_metrics` documents (sorted by
+    timestamp). Each run of contiguous samples is treated as one VM
+    session. When the policy would have shut down, the rest of the
+    session's running time counts as saved. If players show up again
+    during that session, a restart is counted instead, and only the time
+    until then is saved.
+
+    Args:
+        policy: IdlePolicy to evaluate.
+        docs: Iterable of documents; consumed as a stream.
+
+    Returns:
+        dict: sessions, shutdowns, restarts, saved_hours
+    """
+    result = {"sessions": 0, "shutdowns": 0, "restarts": 0, "saved_hours": 0.0}
+    gap = timedelta(seconds=SESSION_GAP_SECONDS)
+
+    state = None
+    off_since = None
+    last_ts = None
+
+    def close_session():
+        if off_since is not None:
+            result["saved_hours"] += (last_ts - off_since).total_seconds() / 3600
+
+    for doc in docs:
+        ts = doc["timestamp"]
+        if last_ts is None or ts - last_ts > gap:
+            if last_ts is not None:
+                close_session()
+            result["sessions"] += 1
+            state = policy.new_state()
+            off_since = None
+        last_ts = ts
+
+        players = doc.get("player_count") or 0
+        if off_since is not None:
+            if players > 0:
+                result["restarts"] += 1
+                result["saved_hours"] += (ts - off_since).total_seconds() / 3600
+                off_since = None
+                state = policy.new_state()
+            continue
+
+        shutdown, _ = policy.evaluate(
+            state,
+            ts,
+            players,
+            cpu=doc.get("cpu_system_pct"),
+            total_joins=doc.get("total_joins"),
+        )
+        if shutdown:
+            result["shutdowns"] += 1
+            off_since = ts
+
+    if last_ts is not None:
+        close_session()
+    return result
@@ -0,0 +1,251 @@
+from mcstatus import JavaServer
+import asyncio
+import time
+from datetime import datetime
+
+from utils import (
+    SERVERS,
+    invalidate_vm_statuses,
+    ping_player_count,
+    get_server_stats,
+    stop_mc_server,
+    start_vm,
+    stop_vm,
+)
+from stats.mongo import boot_timings, shutdown_timings
+
+BOOT_DEADLINE_SECONDS = 600
+PORT_TIMEOUT_SECONDS = 3
+
+# Time allowed for Minecraft to save and exit before the VM is stopped anyway.
+SHUTDOWN_DEADLINE_SECONDS = 120
+# Consecutive "stopped" probes needed before the server counts as stopped.
+STOPPED_CONFIRMATIONS = 2
+VM_STOP_ATTEMPTS = 3
+
+BOOT_PHASES = ("api_accepted", "vm_running", "port_open", "status_ok")
+SHUTDOWN_PHASES = ("stop_accepted", "world_stopped", "vm_stopped")
+
+
+async def poll_until(check, deadline, initial=1.0, factor=1.5, maximum=10.0):
+    """
+    STACK: Server lifecycle
+    Await `check()` until it returns a truthy value, backing off
+    exponentially between attempts.
+
+    Args:
+        check: Async callable returning truthy once the condition holds.
+        deadline: `time.monotonic()` value after which to give up.
+        initial: First delay in seconds.
+        factor: Delay multiplier per attempt.
+        maximum: Upper bound for a single delay.
+
+    Returns:
+        bool: Whether the condition held before the deadline.
+    """
+    delay = initial
+    while True:
+        if await check():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * factor, maximum)
+
+
+async def is_port_open(server):
+    """
+    STACK: Server lifecycle
+    Check whether the server's Java port accepts TCP connections.
+    """
+    try:
+        address = await asyncio.to_thread(
+            lambda: JavaServer.lookup(SERVERS[server]["SERVER_IP"]).address
+        )
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(address.host, address.port),
+            timeout=PORT_TIMEOUT_SECONDS,
+        )
+        writer.close()
+        await writer.wait_closed()
+        return True
+    except (OSError, asyncio.TimeoutError):
+        return False
+    except Exception as e:
+        print(f"[LIFECYCLE] Port probe failed for {server}: {type(e).__name__}")
+        return False
+
+
+async def is_status_ok(server):
+    """
+    STACK: Server lifecycle
+    Check whether the Minecraft server answers a status ping. Crafty is not
+    used here: it reports the process as running while the world is still
+    loading.
+    """
+    return await ping_player_count(server) is not None
+
+
+async def is_world_stopped(server):
+    """
+    STACK: Server lifecycle
+    Check whether Crafty reports the server process as stopped, falling back
+    to a failed status ping when Crafty is unavailable.
+    """
+    stats = await get_server_stats(server)
+    if stats is not None:
+        return not stats["running"]
+    return not await is_status_ok(server)
+
+
+async def boot_server(server, trigger="command", on_phase=None):
+    """
+    STACK: Server lifecycle
+    Start a server's VM and wait until Minecraft actually answers, recording
+    when each phase was reached:
+
+    - `api_accepted`: GCP accepted the start request
+    - `vm_running`: the start operation finished and the VM is RUNNING
+    - `port_open`: the Java port accepts connections
+    - `status_ok`: a status ping succeeds
+
+    The timings are stored in `boot_timings` so cold starts can be tracked.
+
+    Args:
+        server: Name of the server to boot.
+        trigger: What caused the boot (`command`, `vote`, `prewarm`, ...).
+        on_phase: Optional async callback, called with each phase name.
+
+    Returns:
+        bool: Whether the server became ready before the deadline.
+    """
+    instance = SERVERS[server]["INSTANCE_NAME"]
+    requested = datetime.utcnow()
+    deadline = time.monotonic() + BOOT_DEADLINE_SECONDS
+    phases = {}
+
+    async def mark(phase):
+        phases[phase] = datetime.utcnow()
+        elapsed = (phases[phase] - requested).total_seconds()
+        print(f"[LIFECYCLE] {server}: {phase} after {elapsed:.1f}s")
+        if on_phase:
+            await on_phase(phase)
+
+    operation = await start_vm(server)
+    await mark("api_accepted")
+
+    await asyncio.to_thread(operation.result)
+    invalidate_vm_statuses()
+    print(f"[VM CONTROL] {instance} started")
+    await mark("vm_running")
+
+    ready = False
+    if await poll_until(lambda: is_port_open(server), deadline):
+        await mark("port_open")
+        if await poll_until(lambda: is_status_ok(server), deadline):
+            await mark("status_ok")
+            ready = True
+
+    await asyncio.to_thread(
+        boot_timings.insert_one,
+        {
+            "server": server,
+            "trigger": trigger,
+            "requested_at": requested,
+            "phases": phases,
+            "durations": {
+                phase: (ts - requested).total_seconds() for phase, ts in phases.items()
+            },
+            "ready": ready,
+        },
+    )
+    return ready
+
+
+async def halt_server(server, trigger="command", on_phase=None):
+    """
+    STACK: Server lifecycle
+    Stop a server's Minecraft process, confirm it has saved and exited, then
+    stop its VM, recording when each phase was reached:
+
+    - `stop_accepted`: Crafty accepted the stop request (retried with backoff)
+    - `world_stopped`: Crafty (or a failed status ping) reports it stopped
+    - `vm_stopped`: the VM stop operation finished
+
+    If Minecraft has not confirmed within `SHUTDOWN_DEADLINE_SECONDS`, the VM
+    is stopped anyway so an unresponsive server is never left billing. The
+    timings are stored in `shutdown_timings`.
+
+    Args:
+        server: Name of the server to stop.
+        trigger: What caused the shutdown (`command`, `idle`, ...).
+        on_phase: Optional async callback, called with each phase name.
+
+    Returns:
+        dict: {"forced": bool, "vm_stopped": bool}
+    """
+    requested = datetime.utcnow()
+    deadline = time.monotonic() + SHUTDOWN_DEADLINE_SECONDS
+    phases = {}
+
+    async def mark(phase):
+        phases[phase] = datetime.utcnow()
+        elapsed = (phases[phase] - requested).total_seconds()
+        print(f"[LIFECYCLE] {server}: {phase} after {elapsed:.1f}s")
+        if on_phase:
+            await on_phase(phase)
+
+    async def request_stop():
+        try:
+            await stop_mc_server(server)
+            return True
+        except Exception as e:
+            print(f"[LIFECYCLE] Stop request for {server} failed: {e}")
+            return False
+
+    stopped_probes = 0
+
+    async def world_stopped():
+        nonlocal stopped_probes
+        stopped_probes = stopped_probes + 1 if await is_world_stopped(server) else 0
+        return stopped_probes >= STOPPED_CONFIRMATIONS
+
+    forced = True
+    if await poll_until(request_stop, deadline):
+        await mark("stop_accepted")
+        if await poll_until(world_stopped, deadline):
+            await mark("world_stopped")
+            forced = False
+
+    if forced:
+        print(f"[LIFECYCLE] {server} did not confirm shutdown, forcing VM stop")
+
+    vm_stopped = False
+    for attempt in range(VM_STOP_ATTEMPTS):
+        try:
+            await stop_vm(server)
+            vm_stopped = True
+            break
+        except Exception as e:
+            print(f"[LIFECYCLE] VM stop attempt {attempt + 1} for {server} failed: {e}")
+            await asyncio.sleep(2**attempt)
+
+    if vm_stopped:
+        await mark("vm_stopped")
+
+    await asyncio.to_thread(
+        shutdown_timings.insert_one,
+        {
+            "server": server,
+            "trigger": trigger,
+            "requested_at": requested,
+            "phases": phases,
+            "durations": {
+                phase: (ts - requested).total_seconds() for phase, ts in phases.items()
+            },
+            "forced": forced,
+            "vm_stopped": vm_stopped,
+        },
+    )
+    return {"forced": forced, "vm_stopped": vm_stopped}
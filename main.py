@@ -2,26 +2,49 @@ import os
 from dotenv import load_dotenv
 
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from datetime import datetime, timezone
 
 from utils import (
     is_admin,
     get_player_count,
-    start_vm,
-    stop_vm,
-    stop_mc_server,
     get_vm_status,
     format_duration,
     gb,
     ping_stats,
+    get_server,
+    refresh_vm_statuses,
+    SERVERS,
+    PREWARM,
+    STATUS_BOARD,
+    ANOMALY,
+    IDLE_POLICY,
+    DEFAULT_SERVER,
+    GUILD_ID,
 )
 from webserver import run_webserver
+from lifecycle import boot_server, halt_server
+from admission import AdmissionQueue, QueueFull
+from idle_policy import IdlePolicy, replay
+from pymongo.errors import PyMongoError
+from state import StateStore
 from stats.graphs import plot_metric
 from stats.mongo import server_metrics, players, duels_db
-from datetime import datetime, timezone
+from stats.activity import update_activity, activity_heatmap
+from stats.export import EXPORTS, FORMATS, parse_range, export_to_file
+from stats.live import watch_metrics
+from stats.anomaly import AnomalyDetector
+from stats.snapshots import snapshot_players, player_window, leaderboard
+from stats.prewarm import next_slot, record_prewarm, resolve_prewarm, prewarm_report
+from datetime import datetime, timezone, timedelta
 
 import threading
+import asyncio
+import io
+import math
+import hashlib
+import json
 
 load_dotenv()
 BOT_TOKEN = os.getenv("BOT_TOKEN")
@@ -29,14 +52,89 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 intents = discord.Intents.default()
 intents.message_content = True
 bot = commands.Bot(command_prefix="$", intents=intents)
-empty_time = None
-trigger_shutdown = False
 
 VOTE_EMOJI = "👍"
 REQUIRED_VOTES = 4
 
-active_vote_message_id = None
-current_votes = set()
+idle_policy = IdlePolicy(IDLE_POLICY)
+
+# Per-server control state: idle policy state, shutdown latch and the open vote.
+server_state = {
+    name: {
+        **IdlePolicy.new_state(),
+        "trigger_shutdown": False,
+        "shutdown_task": None,
+        "active_vote_message_id": None,
+        "current_votes": set(),
+        "prewarm": None,
+    }
+    for name in SERVERS
+}
+last_prewarm_slot = None
+
+# Newest `server_metrics` document, pushed by the live watcher thread.
+latest_metrics = {"doc": None}
+metrics_updated = asyncio.Event()
+metrics_stop = threading.Event()
+loops_started = False
+# Feed documents older than this are not shown as live.
+LIVE_MAX_AGE = timedelta(seconds=30)
+status_message_id = None
+
+state_store = StateStore()
+# Idle timers older than this are not trusted after a restart.
+STATE_MAX_AGE = timedelta(minutes=15)
+
+STATUS_FOOTER = "Live status · updates automatically"
+
+detector = AnomalyDetector(
+    z_threshold=ANOMALY["Z_THRESHOLD"],
+    sustain=ANOMALY["SUSTAIN_SAMPLES"],
+    suppress_seconds=ANOMALY["SUPPRESS_MINUTES"] * 60,
+)
+
+# Graph queries can overlap but renders share one figure template, so keep
+# graph concurrency low; stats lookups are mostly I/O and can overlap more.
+graph_queue = AdmissionQueue("graph", concurrency=2, max_queue=20)
+stats_queue = AdmissionQueue("stats", concurrency=4, max_queue=50)
+
+
+async def admit(queue, ctx, key, work):
+    """
+    STACK: Admission control
+    Run `work` through an admission queue on behalf of a command, telling
+    the user when they have to wait.
+
+    Args:
+        ctx: Command context, or a deferred `discord.Interaction`.
+
+    Returns:
+        The result of `work`, or None if the request was turned away.
+    """
+    if isinstance(ctx, discord.Interaction):
+        user = ctx.user
+
+        async def notify(text):
+            await ctx.edit_original_response(content=text)
+
+    else:
+        user = ctx.author
+        notify = ctx.reply
+
+    async def on_queued(position):
+        await notify(f"⏳ Busy, queued #{position}")
+
+    try:
+        return await queue.submit(
+            key,
+            ctx.guild.id if ctx.guild else None,
+            user.id,
+            work,
+            on_queued=on_queued,
+        )
+    except QueueFull:
+        await notify("🚦 The bot is overloaded right now, try again in a moment.")
+        return None
 
 
 CLOCK = "<a:Minecraft_clock:1462830831092498671>"
@@ -49,7 +147,16 @@ RED_DOT = "🔴"
 GREEN_DOT = "🟢"
 
 
-def embed_starting():
+def server_label(server):
+    """
+    STACK: Discord information
+    Suffix naming the server in embed titles. Empty when only one server
+    is managed, so single-server setups look exactly as before.
+    """
+    return f" · {server}" if len(SERVERS) > 1 else ""
+
+
+def embed_starting(server):
     """
     STACK: Discord information
     Send an `Embed` acknowledgment when the server is starting.
@@ -59,7 +166,7 @@ def embed_starting():
     """
     return (
         discord.Embed(
-            title=f"{CLOCK} Starting PESU Minecraft Server",
+            title=f"{CLOCK} Starting PESU Minecraft Server{server_label(server)}",
             description=(
                 "Your beloved server is booting up!\n\n"
                 f"This may take a while {PARROT}"
@@ -74,7 +181,7 @@ def embed_starting():
     )
 
 
-def embed_started():
+def embed_started(server):
     """
     STACK: Discord information
     Send an `Embed` acknowledgment when the server has started.
@@ -83,14 +190,33 @@ def embed_started():
         Embed (Discord obj)
     """
     return discord.Embed(
-        title="✅ Server Online",
+        title=f"✅ Server Online{server_label(server)}",
         description=(f"Get in losers - the server is going live! {CHEST}"),
         color=discord.Color.green(),
         timestamp=datetime.now(timezone.utc),
     ).set_footer(text="Xymic")
 
 
-def embed_manual_stop():
+def embed_not_ready(server):
+    """
+    STACK: Discord information
+    Send an `Embed` acknowledgment when the VM booted but Minecraft never answered.
+
+    Returns:
+        Embed (Discord obj)
+    """
+    return discord.Embed(
+        title=f"⚠️ Server Not Responding{server_label(server)}",
+        description=(
+            "The VM is up, but the Minecraft server has not answered yet.\n"
+            "It may still be loading - try again in a few minutes."
+        ),
+        color=discord.Color.orange(),
+        timestamp=datetime.now(timezone.utc),
+    ).set_footer(text="Xymic")
+
+
+def embed_manual_stop(server):
     """
     STACK: Discord information
     Send an `Embed` acknowledgment when the server is shutting down.
@@ -99,25 +225,31 @@ def embed_manual_stop():
         Embed (Discord obj)
     """
     return discord.Embed(
-        title=f"{TNT} Server Shutdown Requested",
+        title=f"{TNT} Server Shutdown Requested{server_label(server)}",
         description=("The Minecraft server is now shutting down.\n"),
         color=discord.Color.orange(),
         timestamp=datetime.now(timezone.utc),
     ).set_footer(text="Xymic")
 
 
-def embed_auto_shutdown():
+def embed_auto_shutdown(server, idle_seconds):
     """
     STACK: Discord information
     Send an `Embed` acknowledgment when the server stops automatically.
 
+    Args:
+        server: Name of the server.
+        idle_seconds: How long the server has been empty.
+
     Returns:
         Embed (Discord obj)
     """
+    minutes = max(1, round(idle_seconds / 60))
     return discord.Embed(
-        title=f"{SAD} Server Idle",
+        title=f"{SAD} Server Idle{server_label(server)}",
         description=(
-            "The server has been empty for **1 minute**.\n"
+            f"The server has been empty for **{minutes} minute"
+            f"{'' if minutes == 1 else 's'}**.\n"
             "Initiating automatic shutdown sequence…"
         ),
         color=discord.Color.gold(),
@@ -125,7 +257,7 @@ def embed_auto_shutdown():
     ).set_footer(text="Xymic")
 
 
-def embed_stopped():
+def embed_stopped(server):
     """
     STACK: Discord information
     Send an `Embed` acknowledgment when the server has shut down.
@@ -135,7 +267,7 @@ def embed_stopped():
     """
     return (
         discord.Embed(
-            title="❌ Server Stopped",
+            title=f"❌ Server Stopped{server_label(server)}",
             description=(
                 "The Minecraft server has been stopped successfully.\n\n"
                 f"{FLAME} The VM is now powering off to save resources."
@@ -150,6 +282,52 @@ def embed_stopped():
     )
 
 
+def embed_forced_stop(server):
+    """
+    STACK: Discord information
+    Send an `Embed` acknowledgment when the server had to be stopped without
+    confirming that the world was saved.
+
+    Returns:
+        Embed (Discord obj)
+    """
+    return discord.Embed(
+        title=f"⚠️ Forced Shutdown{server_label(server)}",
+        description=(
+            "The Minecraft server did not confirm it had stopped in time, "
+            "so the VM was powered off anyway."
+        ),
+        color=discord.Color.orange(),
+        timestamp=datetime.now(timezone.utc),
+    ).set_footer(text="Xymic")
+
+
+def embed_anomaly(alerts):
+    """
+    STACK: Stats
+    Send an `Embed` warning about anomalous server metrics.
+
+    Returns:
+        Embed (Discord obj)
+    """
+    embed = discord.Embed(
+        title="⚠️ Server Health Alert",
+        description="Unusual server metrics - lag may follow.",
+        color=discord.Color.orange(),
+        timestamp=datetime.now(timezone.utc),
+    )
+    for alert in alerts:
+        embed.add_field(
+            name=alert["label"],
+            value=(
+                f"Now: `{alert['value']}` (usual `{alert['baseline']}`)\n"
+                f"{alert['reason']}"
+            ),
+            inline=True,
+        )
+    return embed.set_footer(text="Xymic")
+
+
 def embed_no_permission():
     """
     STACK: Discord permissions
@@ -169,9 +347,9 @@ def embed_no_permission():
     ).set_footer(text="Xymic")
 
 
-def embed_vote_start():
+def embed_vote_start(server):
     return discord.Embed(
-        title="🗳️ Vote to Start Server",
+        title=f"🗳️ Vote to Start Server{server_label(server)}",
         description=(
             f"React with {VOTE_EMOJI} to start the Minecraft server.\n\n"
             f"Votes needed: **{REQUIRED_VOTES+1}**"
@@ -181,7 +359,7 @@ def embed_vote_start():
     ).set_footer(text="Xymic")
 
 
-def embed_vm_stop():
+def embed_vm_stop(server):
     """
     STACK: VM control
     Send an `Embed` acknowledgment when the Google VM stops.
@@ -190,7 +368,7 @@ def embed_vm_stop():
         Embed (Discord obj)
     """
     return discord.Embed(
-        title="The VM has been stopped.",
+        title=f"The VM has been stopped.{server_label(server)}",
         color=discord.Color.red(),
         timestamp=datetime.now(timezone.utc),
     ).set_footer(text="Xymic")
@@ -202,114 +380,563 @@ async def on_ready():
     STACK: Discord Bot
     Login acknowledgement and start timers for `check_server`
     """
+    global loops_started
     print(f"[DISCORD BOT] Logged in as {bot.user}")
+    if loops_started:
+        # Gateway reconnect: everything below is already running.
+        return
+    loops_started = True
+
+    try:
+        await restore_state()
+    except Exception as e:
+        # Start fresh rather than leave idle shutdown switched off.
+        print(f"[BOT STATE] Could not restore saved state: {e!r}")
     check_server.start()
+    snapshot_loop.start()
+    persist_state.start()
+    if PREWARM["ENABLED"]:
+        prewarm_server.start()
+    if STATUS_BOARD["ENABLED"] or ANOMALY["ENABLED"]:
+        start_metrics_feed()
+    if STATUS_BOARD["ENABLED"]:
+        channel = discord.utils.get(
+            bot.get_all_channels(), name=STATUS_BOARD["CHANNEL"]
+        )
+        if channel:
+            bot.loop.create_task(run_status_board(channel))
+
+
+def export_state():
+    """
+    STACK: Bot state
+    Snapshot of the control state that should survive a restart. Only
+    fields that change on events are kept; the idle policy's join samples
+    change on every tick and simply refill after a restart.
+    """
+    return {
+        "servers": {
+            name: {
+                "empty_time": state["empty_time"],
+                "present_since": state["present_since"],
+                "active_vote_message_id": state["active_vote_message_id"],
+                "current_votes": sorted(state["current_votes"]),
+                "prewarm": state["prewarm"],
+            }
+            for name, state in server_state.items()
+        },
+        "last_prewarm_slot": last_prewarm_slot,
+        "status_message_id": status_message_id,
+    }
+
+
+async def restore_state():
+    """
+    STACK: Bot state
+    Restore the control state saved before the last restart, so idle timers,
+    open votes and pending pre-warms carry on where they left off. This is a
+    single document read; no channels are scanned.
+    """
+    global last_prewarm_slot, status_message_id
+
+    saved = await asyncio.to_thread(state_store.load)
+    if not saved:
+        return
+
+    fresh = datetime.utcnow() - saved["saved_at"] < STATE_MAX_AGE
+    for name, data in saved.get("servers", {}).items():
+        if name not in server_state:
+            continue
+        state = server_state[name]
+        if fresh:
+            state["empty_time"] = data.get("empty_time")
+            state["present_since"] = data.get("present_since")
+        state["active_vote_message_id"] = data.get("active_vote_message_id")
+        state["current_votes"] = set(data.get("current_votes", []))
+        state["prewarm"] = data.get("prewarm")
+
+    last_prewarm_slot = saved.get("last_prewarm_slot")
+    status_message_id = saved.get("status_message_id")
+    print(f"[BOT STATE] Restored state saved at {saved['saved_at']:%H:%M:%S} UTC")
+
+
+@tasks.loop(seconds=5)
+async def persist_state():
+    """
+    STACK: Bot state
+    Write-behind: stage the current state and write it only if it changed.
+    """
+    state_store.stage(export_state())
+    try:
+        await asyncio.to_thread(state_store.flush)
+    except PyMongoError as e:
+        # The snapshot stays staged; the next tick writes it.
+        print(f"[BOT STATE] Could not save state: {e!r}")
+
+
+def start_metrics_feed():
+    """
+    STACK: Stats
+    Start the background thread that follows new `server_metrics` documents
+    and hands them to the event loop.
+    """
+    loop = asyncio.get_running_loop()
+
+    def publish(doc):
+        latest_metrics["doc"] = doc
+        metrics_updated.set()
+        if ANOMALY["ENABLED"]:
+            alerts = detector.update(doc)
+            if alerts:
+                loop.create_task(post_anomaly_alerts(alerts))
+
+    threading.Thread(
+        target=watch_metrics,
+        args=(lambda doc: loop.call_soon_threadsafe(publish, doc), metrics_stop),
+        daemon=True,
+    ).start()
+
+
+async def post_anomaly_alerts(alerts):
+    """
+    STACK: Stats
+    Post alerts raised by the anomaly detector.
+    """
+    for alert in alerts:
+        print(f"[STATS] Anomaly: {alert['label']} {alert['value']} ({alert['reason']})")
+
+    channel = discord.utils.get(bot.get_all_channels(), name=ANOMALY["CHANNEL"])
+    if channel:
+        await channel.send(embed=embed_anomaly(alerts))
+
+
+async def find_status_message(channel):
+    """
+    STACK: Stats
+    Find the bot's pinned status message in `channel`, or post and pin one.
+    """
+    for message in await channel.pins():
+        if message.author == bot.user and any(
+            embed.footer.text == STATUS_FOOTER for embed in message.embeds
+        ):
+            return message
+
+    message = await channel.send("Loading server status…")
+    await message.pin()
+    return message
+
+
+async def run_status_board(channel):
+    """
+    STACK: Stats
+    Keep the pinned status message in sync with the newest metrics. Edits
+    are driven by the metrics feed and spaced at least `MIN_EDIT_SECONDS`
+    apart to stay well inside Discord's rate limits.
+    """
+    global status_message_id
+
+    message = None
+    if status_message_id:
+        try:
+            message = await channel.fetch_message(status_message_id)
+        except discord.HTTPException:
+            message = None
+    if message is None:
+        message = await find_status_message(channel)
+    status_message_id = message.id
+
+    while True:
+        await metrics_updated.wait()
+        metrics_updated.clear()
+
+        offline = await get_vm_status() != "RUNNING"
+        embed = embed_server_stats(
+            latest_metrics["doc"], offline, title="📌 Live Server Status"
+        )
+        embed.set_footer(text=STATUS_FOOTER)
+
+        try:
+            await message.edit(content=None, embed=embed)
+        except discord.NotFound:
+            message = await find_status_message(channel)
+            status_message_id = message.id
+        except discord.HTTPException as e:
+            print(f"[STATS] Failed to update status message: {e}")
+
+        await asyncio.sleep(STATUS_BOARD["MIN_EDIT_SECONDS"])
 
 
 @bot.event
-async def on_reaction_add(reaction, user):
+async def on_raw_reaction_add(payload):
     """
     Reaction counter to check if the reactions matched the
     required number and start the VM accordingly.
 
+    Uses the raw event so votes on a message sent before a restart, which is
+    not in the message cache, still count.
+
     Args:
-        reaction: Reaction object
-        user: User that reacted
+        payload: Raw reaction event
     """
-    global current_votes, active_vote_message_id
-
-    if user.bot:
+    # Votes only count in guild channels, where `member` is always set.
+    if payload.member is None or payload.member.bot:
         return
-    if active_vote_message_id is None:
+    if str(payload.emoji) != VOTE_EMOJI:
         return
-    if reaction.message.id != active_vote_message_id:
-        return
-    if str(reaction.emoji) != VOTE_EMOJI:
+
+    server = next(
+        (
+            name
+            for name, state in server_state.items()
+            if state["active_vote_message_id"] == payload.message_id
+        ),
+        None,
+    )
+    if server is None:
         return
-    if user.id in current_votes:
+
+    state = server_state[server]
+    if payload.user_id in state["current_votes"]:
         return
 
-    current_votes.add(user.id)
+    state["current_votes"].add(payload.user_id)
 
-    print(f"[DISCORD BOT] Votes: {len(current_votes)}/{REQUIRED_VOTES}")
+    print(
+        f"[DISCORD BOT] Votes ({server}): "
+        f"{len(state['current_votes'])}/{REQUIRED_VOTES}"
+    )
 
-    if len(current_votes) >= REQUIRED_VOTES:
-        channel = reaction.message.channel
-        active_vote_message_id = None
-        current_votes.clear()
+    if len(state["current_votes"]) >= REQUIRED_VOTES:
+        channel = bot.get_channel(payload.channel_id) or await bot.fetch_channel(
+            payload.channel_id
+        )
+        state["active_vote_message_id"] = None
+        state["current_votes"].clear()
 
-        await channel.send(embed=embed_starting())
-        await start_vm()
-        await channel.send(embed=embed_started())
+        await channel.send(embed=embed_starting(server))
+        if await boot_server(server, trigger="vote"):
+            await channel.send(embed=embed_started(server))
+        else:
+            await channel.send(embed=embed_not_ready(server))
 
 
 @bot.command()
-async def start(ctx):
+async def start(ctx, server=None):
     """
     STACK: Server control
     Starts the minecraft server if the user is admin, if not,
     make a poll to get 4+ votes in order to start the server.
 
+    Args:
+        server: Which server to start. Defaults to the first configured one.
     """
-    global active_vote_message_id, current_votes
+    name = get_server(server)
+    if name is None:
+        await ctx.reply(f"Unknown server.\nAvailable: {', '.join(SERVERS)}")
+        return
+
+    state = server_state[name]
     if is_admin(ctx):
-        await ctx.reply(embed=embed_starting())
-        await start_vm()
-        await ctx.reply(embed=embed_started())
+        await ctx.reply(embed=embed_starting(name))
+        if await boot_server(name, trigger="command"):
+            await ctx.reply(embed=embed_started(name))
+        else:
+            await ctx.reply(embed=embed_not_ready(name))
         return
 
     else:
-        current_votes = set()
-        vote_message = await ctx.reply(embed=embed_vote_start())
-        active_vote_message_id = vote_message.id
+        state["current_votes"] = set()
+        vote_message = await ctx.reply(embed=embed_vote_start(name))
+        state["active_vote_message_id"] = vote_message.id
         await vote_message.add_reaction(VOTE_EMOJI)
 
 
 @bot.command()
-async def stop(ctx):
+async def stop(ctx, server=None):
     """
     STACK: Server control
     Stop the server.
+
+    Args:
+        server: Which server to stop. Defaults to the first configured one.
     """
     if not is_admin(ctx):
         await ctx.reply(embed=embed_no_permission())
         return
-    await ctx.reply(embed=embed_manual_stop())
-    await shutdown_server(manual=True)
+    name = get_server(server)
+    if name is None:
+        await ctx.reply(f"Unknown server.\nAvailable: {', '.join(SERVERS)}")
+        return
+    task = begin_shutdown(name, manual=True)
+    if task is None:
+        await ctx.reply(f"{server_label(name)} is already shutting down.")
+        return
+    await ctx.reply(embed=embed_manual_stop(name))
+    await task
 
 
 @tasks.loop(seconds=10)
 async def check_server():
     """
     STACK: Server control
-    Poll to check if server has no members for longer than a minute and shutdown accordingly.
+    Poll every managed server concurrently and shut down any that have had
+    no members for longer than a minute. Refreshes the shared VM status
+    snapshot that the stats commands read from.
     """
-    global empty_time, trigger_shutdown
-    status = await get_vm_status()
+    fetched_at = datetime.utcnow()
+    statuses = await refresh_vm_statuses()
+    await asyncio.gather(
+        *(
+            check_instance(name, status, fetched_at)
+            for name, status in statuses.items()
+        )
+    )
+
+
+async def check_instance(server, status, fetched_at):
+    """
+    STACK: Server control
+    Idle check for a single server, driven by `check_server`.
+
+    Args:
+        server: Name of the server.
+        status: Its VM status from the batched lookup.
+        fetched_at: Naive UTC time the lookup was started.
+    """
+    state = server_state[server]
 
     if status == "RUNNING":
-        player_count = await get_player_count()
+        player_count = await get_player_count(server)
         if player_count is None:
             return
 
-        print(f"[SERVER CONTROL] Players online: {player_count}")
-        if player_count == 0:
-            if empty_time is None:
-                empty_time = datetime.now()
+        print(f"[SERVER CONTROL] Players online ({server}): {player_count}")
+
+        prewarm = state["prewarm"]
+        if prewarm:
+            if player_count > 0:
+                await asyncio.to_thread(
+                    resolve_prewarm, prewarm["id"], True, prewarm["started_at"]
+                )
+                state["prewarm"] = None
+            elif datetime.utcnow() < prewarm["grace_until"]:
+                # Hold the idle timer while we wait for the predicted players.
+                return
             else:
-                elapsed = (datetime.now() - empty_time).total_seconds()
-                if elapsed >= 60 and not trigger_shutdown:
-                    trigger_shutdown = True
-                    await shutdown_server()
-        else:
-            empty_time = None
-            trigger_shutdown = False
+                await asyncio.to_thread(
+                    resolve_prewarm, prewarm["id"], False, prewarm["started_at"]
+                )
+                state["prewarm"] = None
+
+        cpu = total_joins = None
+        if server == DEFAULT_SERVER and player_count == 0:
+            # Only the default server reports to `server_metrics`.
+            doc = latest_metrics["doc"]
+            if doc is None:
+                try:
+                    doc = await asyncio.to_thread(
+                        server_metrics.find_one, sort=[("timestamp", -1)]
+                    )
+                except PyMongoError as e:
+                    # Decide on player count alone rather than stop the loop.
+                    print(f"[SERVER CONTROL] Metrics lookup failed: {e!r}")
+            if doc and datetime.utcnow() - doc["timestamp"] < timedelta(minutes=1):
+                cpu = doc.get("cpu_system_pct")
+                total_joins = doc.get("total_joins")
+
+        shutdown, idle_seconds = idle_policy.evaluate(
+            state, datetime.utcnow(), player_count, cpu=cpu, total_joins=total_joins
+        )
+        if player_count > 0:
+            state["trigger_shutdown"] = False
+        elif shutdown and not state["trigger_shutdown"]:
+            begin_shutdown(server, idle_seconds=idle_seconds)
     else:
-        print("[SERVER CONTROL] Server is off")
+        print(f"[SERVER CONTROL] {server} is off")
+        # Idle time only counts while the VM is up.
+        state.update(IdlePolicy.new_state())
+        if state["shutdown_task"] is None:
+            # The VM is down, so the next boot may be shut down again.
+            state["trigger_shutdown"] = False
+        prewarm = state["prewarm"]
+        # A lookup started before the pre-warm may predate its start request.
+        if prewarm and status == "TERMINATED" and fetched_at > prewarm["started_at"]:
+            await asyncio.to_thread(
+                resolve_prewarm, prewarm["id"], False, prewarm["started_at"]
+            )
+            state["prewarm"] = None
+
+
+def begin_shutdown(server, manual=False, idle_seconds=0):
+    """
+    STACK: Server control
+    Start a confirmed shutdown as its own task, behind the server's shutdown
+    latch, so idle and manual stops never run at the same time. The halt can
+    take minutes; running it apart keeps the other servers being polled.
+
+    Returns:
+        asyncio.Task | None: The shutdown task, or None if one is in flight.
+    """
+    state = server_state[server]
+    if state["shutdown_task"] is not None:
+        return None
+    state["trigger_shutdown"] = True
+    task = asyncio.create_task(
+        shutdown_server(server, manual=manual, idle_seconds=idle_seconds)
+    )
+    state["shutdown_task"] = task
+    task.add_done_callback(lambda t: shutdown_done(server, t))
+    return task
+
+
+def shutdown_done(server, task):
+    """
+    STACK: Server control
+    Release the shutdown latch once a shutdown has finished. If the
+    VM did not stop, the next idle tick tries again; if it did, the next
+    boot can be shut down once it goes idle.
+    """
+    state = server_state[server]
+    state["shutdown_task"] = None
+    state["trigger_shutdown"] = False
+    if task.cancelled():
+        return
+    error = task.exception()
+    if error is not None:
+        print(f"[SERVER CONTROL] Shutdown of {server} failed: {error!r}")
+
+
+@tasks.loop(minutes=1)
+async def prewarm_server():
+    """
+    STACK: Server control
+    Start the pre-warm server shortly before an hour that historically has
+    players, so they find it already online instead of waiting for a boot.
+    """
+    global last_prewarm_slot
+    server = PREWARM["SERVER"]
+
+    acc = await asyncio.to_thread(update_activity)
+    slot, probability = next_slot(
+        acc,
+        datetime.utcnow(),
+        lead_minutes=PREWARM["LEAD_MINUTES"],
+        threshold=PREWARM["THRESHOLD"],
+        min_weeks=PREWARM["MIN_WEEKS"],
+    )
+    if slot is None or slot == last_prewarm_slot:
+        return
+    last_prewarm_slot = slot
+
+    if await get_vm_status(server) != "TERMINATED":
+        return
+
+    print(
+        f"[SERVER CONTROL] Pre-warming {server} for {slot:%a %H:%M} UTC "
+        f"(p={probability:.2f})"
+    )
+    event_id = await asyncio.to_thread(record_prewarm, server, slot, probability)
+    grace = timedelta(minutes=PREWARM["GRACE_MINUTES"])
+    prewarm = {
+        "id": event_id,
+        "started_at": datetime.utcnow(),
+        "grace_until": slot + grace,
+    }
+    server_state[server]["prewarm"] = prewarm
+    await boot_server(server, trigger="prewarm")
+    # A slow boot must not eat into the time players get to show up.
+    prewarm["grace_until"] = max(slot, datetime.utcnow()) + grace
+
+
+@bot.command()
+async def policy(ctx, days: int = 14):
+    """
+    STACK: Server control
+    Dry-run the configured idle policy over recent history and estimate
+    VM time saved against restarts it would have caused.
+
+    Args:
+        days: How many days of `server_metrics` to replay.
+    """
+    if not is_admin(ctx):
+        await ctx.reply(embed=embed_no_permission())
+        return
+
+    def run():
+        since = datetime.utcnow() - timedelta(days=days)
+        cursor = (
+            server_metrics.find(
+                {"timestamp": {"$gte": since}},
+                {"timestamp": 1, "player_count": 1, "cpu_system_pct": 1, "total_joins": 1},
+            )
+            .sort("timestamp", 1)
+            .batch_size(5000)
+        )
+        return replay(idle_policy, cursor)
+
+    result = await asyncio.to_thread(run)
+
+    embed = discord.Embed(
+        title=f"Idle Policy Replay · last {days} days",
+        description="Compared with what actually happened over the same period.",
+        color=discord.Color.blurple(),
+        timestamp=datetime.now(timezone.utc),
+    )
+    embed.add_field(name="VM Sessions", value=f"`{result['sessions']}`", inline=True)
+    embed.add_field(name="Shutdowns", value=f"`{result['shutdowns']}`", inline=True)
+    embed.add_field(
+        name="Restarts Caused", value=f"`{result['restarts']}`", inline=True
+    )
+    embed.add_field(
+        name="VM Time Saved", value=f"`{result['saved_hours']:.1f} h`", inline=True
+    )
+    embed.set_footer(text="Settings come from idle_policy in config.yaml.")
+    await ctx.reply(embed=embed)
+
+
+@bot.command()
+async def prewarm(ctx, days: int = 30):
+    """
+    STACK: Server control
+    Report how well pre-warming has predicted demand.
+
+    Args:
+        days: How far back to report.
+    """
+    report = await asyncio.to_thread(prewarm_report, days)
+
+    hit_rate = report["hit_rate"]
+    embed = discord.Embed(
+        title=f"Pre-warm Report · last {days} days",
+        description=(
+            "Pre-warming is **enabled**."
+            if PREWARM["ENABLED"]
+            else "Pre-warming is **disabled**."
+        ),
+        color=discord.Color.blurple(),
+        timestamp=datetime.now(timezone.utc),
+    )
+    embed.add_field(
+        name="Hit Rate",
+        value=f"`{hit_rate * 100:.1f}%`" if hit_rate is not None else "-",
+        inline=True,
+    )
+    embed.add_field(
+        name="Hits / Misses",
+        value=f"`{report['hits']} / {report['misses']}`",
+        inline=True,
+    )
+    embed.add_field(
+        name="Extra VM Time",
+        value=f"`{report['extra_vm_minutes']:.0f} min`",
+        inline=True,
+    )
+    embed.set_footer(text="Hits are starts players never had to wait for.")
+    await ctx.reply(embed=embed)
 
 
 @bot.command()
-async def stats(ctx, mode=None, player=None):
+async def stats(ctx, mode=None, player=None, span=None):
     """
     STACK: Stats
     Bot command definition for `stats`.
@@ -320,20 +947,129 @@ async def stats(ctx, mode=None, player=None):
     Args:
         mode: Whether to get server information or induvidual player information
         player: The player for which information is to be retreived.
+        span: Optional window for player progress, e.g. `7d`.
     """
     if mode is None:
-        await ctx.reply("Usage: `$stats server` or `$stats player <name>`")
+        await ctx.reply("Usage: `$stats server` or `$stats player <name> [7d]`")
         return
 
+    days = None
+    if span is not None:
+        try:
+            days = span_days(span)
+        except ValueError as e:
+            await ctx.reply(str(e))
+            return
+
     if mode.lower() == "server":
-        await stats_server(ctx)
+        result = await admit(stats_queue, ctx, ("server",), stats_server)
     elif mode.lower() == "player":
         if not player:
             await ctx.reply("Usage: `$stats player <username>`")
             return
-        await stats_player(ctx, player)
+        result = await admit(
+            stats_queue,
+            ctx,
+            ("player", player.lower(), days),
+            lambda: stats_player(player, days),
+        )
     else:
         await ctx.reply("Unknown option. Use `server` or `player`.")
+        return
+
+    if result:
+        await ctx.reply(**result)
+
+
+def span_days(span):
+    """
+    STACK: Stats
+    Whole days covered by a range like `7d` or `48h`.
+
+    Raises:
+        ValueError: If the range is malformed.
+    """
+    return max(1, math.ceil(parse_range(span).total_seconds() / 86400))
+
+
+TOP_STATS = {
+    "playtime": ("total_playtime_ms", "Playtime", format_duration),
+    "joins": ("total_joins", "Joins", str),
+    "deaths": ("total_deaths", "Deaths", str),
+    "kills": ("player_kills", "Player Kills", str),
+    "mobs": ("mob_kills", "Mob Kills", str),
+    "broken": ("blocks_broken", "Blocks Broken", str),
+    "placed": ("blocks_placed", "Blocks Placed", str),
+    "advancements": ("advancements", "Advancements", str),
+    "messages": ("messages_sent", "Messages Sent", str),
+}
+
+
+@bot.command()
+async def top(ctx, stat=None, span="7d"):
+    """
+    STACK: Stats
+    Leaderboard of player progress over a recent window.
+    Usage:
+      $top <stat> [7d]
+    """
+    if stat not in TOP_STATS:
+        await ctx.reply(
+            f"Usage: `$top <stat> [7d]`\nStats: {', '.join(TOP_STATS)}"
+        )
+        return
+    try:
+        days = span_days(span)
+    except ValueError as e:
+        await ctx.reply(str(e))
+        return
+
+    counter, label, fmt = TOP_STATS[stat]
+    rows = await asyncio.to_thread(leaderboard, counter, days)
+    if not rows:
+        await ctx.reply("No activity recorded in that window yet.")
+        return
+
+    lines = [
+        f"**{rank}.** {row['name']} - `{fmt(row['value'])}`"
+        for rank, row in enumerate(rows, start=1)
+    ]
+    embed = discord.Embed(
+        title=f"Top {label} · last {days} days",
+        description="\n".join(lines),
+        color=discord.Color.gold(),
+        timestamp=datetime.now(timezone.utc),
+    )
+    embed.set_footer(text="Xymic")
+    await ctx.reply(embed=embed)
+
+
+@tasks.loop(minutes=15)
+async def snapshot_loop():
+    """
+    STACK: Stats
+    Fold recent player counter growth into daily delta documents.
+    """
+    changed = await asyncio.to_thread(snapshot_players)
+    if changed:
+        print(f"[STATS] Snapshotted {changed} players")
+
+
+GRAPH_METRICS = {
+    "players": ("player_count", "Players Online", 1.0, None),
+    "chunks": ("loaded_chunks", "Loaded Chunks", 1.0, None),
+    "joins": ("total_joins", "Total Joins", 1.0, None),
+    "uniq_joins": ("total_unique_joins", "Total Unique Joins", 1.0, None),
+    "deaths": ("total_deaths", "Total Deaths", 1.0, None),
+    "cpu_sys": ("cpu_system_pct", "System CPU (%)", 1.0, (0, 100)),
+    "cpu": ("cpu_system_pct", "System CPU (%)", 1.0, (0, 100)),
+    "cpu_jvm": ("cpu_jvm_pct", "JVM CPU (%)", 1.0, (0, 100)),
+    "ram_sys": ("ram_system_used", "System RAM Used (GB)", 1 / (1024**3), None),
+    "ram": ("ram_system_used", "System RAM Used (GB)", 1 / (1024**3), None),
+    "ram_jvm": ("jvm_rss_used", "JVM RSS Used (GB)", 1 / (1024**3), None),
+    "heap": ("jvm_heap_used", "JVM Heap Used (GB)", 1 / (1024**3), None),
+}
+
 
 
 @bot.command()
@@ -374,81 +1110,140 @@ async def graph(ctx, metric=None, minutes=60):
         )
         return
 
-    metric_map = {
-        "players": ("player_count", "Players Online", 1.0, None),
-        "chunks": ("loaded_chunks", "Loaded Chunks", 1.0, None),
-        "joins": ("total_joins", "Total Joins", 1.0, None),
-        "uniq_joins": ("total_unique_joins", "Total Unique Joins", 1.0, None),
-        "deaths": ("total_deaths", "Total Deaths", 1.0, None),
-        "cpu_sys": ("cpu_system_pct", "System CPU (%)", 1.0, (0, 100)),
-        "cpu": ("cpu_system_pct", "System CPU (%)", 1.0, (0, 100)),
-        "cpu_jvm": ("cpu_jvm_pct", "JVM CPU (%)", 1.0, (0, 100)),
-        "ram_sys": ("ram_system_used", "System RAM Used (GB)", 1 / (1024**3), None),
-        "ram": ("ram_system_used", "System RAM Used (GB)", 1 / (1024**3), None),
-        "ram_jvm": ("jvm_rss_used", "JVM RSS Used (GB)", 1 / (1024**3), None),
-        "heap": ("jvm_heap_used", "JVM Heap Used (GB)", 1 / (1024**3), None),
-    }
-
     metric = metric.lower()
 
-    if metric not in metric_map:
-        await ctx.reply(f"Unknown metric.\nAvailable: {', '.join(metric_map.keys())}")
+    if metric not in GRAPH_METRICS:
+        await ctx.reply(
+            f"Unknown metric.\nAvailable: {', '.join(GRAPH_METRICS.keys())}"
+        )
+        return
+
+    col = GRAPH_METRICS[metric][0]
+    png = await admit(
+        graph_queue, ctx, (col, minutes), lambda: render_graph(metric, minutes)
+    )
+    if png is None:
+        return
+    if not png:
+        await ctx.reply("No data available for that time range.")
         return
 
-    col, label, scale, clamp = metric_map[metric]
+    await ctx.reply(file=discord.File(io.BytesIO(png), filename=f"{col}.png"))
+
 
-    path = plot_metric(
+async def render_graph(metric, minutes):
+    """
+    STACK: Stats
+    Render a `GRAPH_METRICS` entry off the event loop.
+
+    Returns:
+        bytes: PNG data, empty if there is no data in range.
+    """
+    col, label, scale, clamp = GRAPH_METRICS[metric]
+    png = await asyncio.to_thread(
+        plot_metric,
         col,
         minutes=minutes,
         ylabel=label,
         scale=scale,
         clamp=clamp,
     )
+    return png or b""
 
-    if not path:
-        await ctx.reply("No data available for that time range.")
-        return
-
-    await ctx.reply(file=discord.File(path))
 
-    try:
-        os.remove(path)
-    except Exception as e:
-        print(f"[STATS] Failed to delete graph file {path}: {e}")
+@bot.command()
+async def activity(ctx):
+    """
+    STACK: Stats
+    Hour-of-week heatmap of average players online.
+    """
+    png = await asyncio.to_thread(activity_heatmap)
+    if png is None:
+        await ctx.reply("No activity data yet.")
+        return
+    await ctx.reply(file=discord.File(io.BytesIO(png), filename="activity.png"))
 
 
-async def stats_server(ctx):
+@bot.command()
+async def export(ctx, collection=None, span=None, fmt="csv"):
     """
     STACK: Stats
-    Fetches latest server statistics from MongoDB and returns a Discord embed.
+    Usage:
+      $export <collection> [range] [csv|parquet]
+
+    Streams a collection to a compressed file and attaches it.
+    Range is e.g. `24h`, `7d` or `all`.
     """
-    await ping_stats()
-    doc = server_metrics.find_one(sort=[("timestamp", -1)])
+    if not is_admin(ctx):
+        await ctx.reply(embed=embed_no_permission())
+        return
 
-    if not doc:
-        embed = discord.Embed(
-            title="🔴 Minecraft Server Stats",
-            description="No data available.",
-            color=discord.Color.red(),
-            timestamp=datetime.now(timezone.utc),
+    if collection not in EXPORTS or fmt not in FORMATS:
+        await ctx.reply(
+            "Usage: `$export <collection> [range] [csv|parquet]`\n"
+            f"Collections: {', '.join(EXPORTS)}"
         )
-        await ctx.reply(embed=embed)
+        return
 
-    status = await get_vm_status()
-    # status = "RUNNING"  # DEBUG/TESTING
-    offline = status != "RUNNING"
+    try:
+        delta = parse_range(span)
+    except ValueError as e:
+        await ctx.reply(str(e))
+        return
+
+    try:
+        path = await asyncio.to_thread(export_to_file, collection, delta, fmt)
+    except RuntimeError as e:
+        await ctx.reply(str(e))
+        return
+
+    if not path:
+        await ctx.reply("No data available for that range.")
+        return
+
+    try:
+        limit = ctx.guild.filesize_limit if ctx.guild else 8 * 1024**2
+        if os.path.getsize(path) > limit:
+            await ctx.reply(
+                "Export is too large for Discord - use the `/export` HTTP endpoint."
+            )
+            return
+        await ctx.reply(file=discord.File(path))
+    finally:
+        try:
+            os.remove(path)
+        except Exception as e:
+            print(f"[STATS] Failed to delete export file {path}: {e}")
+
+
+def embed_server_stats(doc, offline, title="Minecraft Server Stats"):
+    """
+    STACK: Stats
+    Build the server statistics embed from a `server_metrics` document.
 
+    Args:
+        doc: Latest `server_metrics` document.
+        offline: Whether the VM is not running.
+        title: Embed title.
+
+    Returns:
+        Embed (Discord obj)
+    """
     embed = discord.Embed(
-        title="Minecraft Server Stats",
+        title=title,
         color=discord.Color.red() if offline else discord.Color.green(),
         timestamp=datetime.now(timezone.utc),
     )
 
-    embed.description = (
-        "🔴 Server is **offline**. Showing last known data."
-        if offline
-        else "🟢 Server is **online**. Showing live data."
-    )
+    if offline:
+        embed.description = "🔴 Server is **offline**. Showing last known data."
+    elif datetime.utcnow() - doc["timestamp"] > LIVE_MAX_AGE:
+        embed.description = (
+            "🟡 Server is **online**, but metrics are delayed. "
+            "Showing last known data."
+        )
+    else:
+        embed.description = "🟢 Server is **online**. Showing live data."
 
     embed.add_field(
         name="Players Online",
@@ -511,22 +1306,59 @@ async def stats_server(ctx):
         inline=True,
     )
 
-    await ctx.reply(embed=embed)
+    return embed
 
 
-async def stats_player(ctx, username):
+async def stats_server():
+    """
+    STACK: Stats
+    Fetches latest server statistics from MongoDB and returns a Discord embed.
+
+    Returns:
+        dict: Keyword arguments for `ctx.reply`.
+    """
+    doc = latest_metrics["doc"]
+    if doc is None or datetime.utcnow() - doc["timestamp"] > LIVE_MAX_AGE:
+        # No live feed, or it has stalled, so ask for a fresh push and read it back.
+        await ping_stats()
+        doc = server_metrics.find_one(sort=[("timestamp", -1)])
+
+    if not doc:
+        embed = discord.Embed(
+            title="🔴 Minecraft Server Stats",
+            description="No data available.",
+            color=discord.Color.red(),
+            timestamp=datetime.now(timezone.utc),
+        )
+        return {"embed": embed}
+
+    status = await get_vm_status()
+    # status = "RUNNING"  # DEBUG/TESTING
+    offline = status != "RUNNING"
+
+    return {"embed": embed_server_stats(doc, offline)}
+
+
+async def stats_player(username, days=None):
     """
     STACK: Stats
     Fetches individual player statistics based on username from MongoDB.
+
+    Args:
+        username: Player name.
+        days: If set, also show the player's progress over this many days.
+
+    Returns:
+        dict: Keyword arguments for `ctx.reply`.
     """
     await ping_stats()
     doc = players.find_one({"name": {"$regex": f"^{username}$", "$options": "i"}})
-    true_deaths = doc.get("total_deaths", 0)
-    true_player_kills = doc.get("player_kills", 0)
 
     if not doc:
-        await ctx.reply("Player not found.")
-        return
+        return {"content": "Player not found."}
+
+    true_deaths = doc.get("total_deaths", 0)
+    true_player_kills = doc.get("player_kills", 0)
     status = await get_vm_status() == "RUNNING"
     online = bool(doc.get("online", False)) & status
     # online = bool(doc.get("online", False)) & True  # DEBUG/TESTING
@@ -619,7 +1451,104 @@ async def stats_player(ctx, username):
         ),
         inline=True,
     )
+    if days is not None:
+        window = await asyncio.to_thread(player_window, doc.get("uuid"), days)
+        lines = [
+            f"{label}: +{fmt(window[counter])}"
+            for counter, label, fmt in TOP_STATS.values()
+            if window.get(counter)
+        ]
+        embed.add_field(
+            name=f"Last {days} days",
+            value="\n".join(lines) or "No activity.",
+            inline=False,
+        )
+
     embed.set_footer(text=f"UUID: {doc.get('uuid', 'unknown')}")
+    return {"embed": embed}
+
+
+MAX_COMPARE = 10
+# Case-insensitive matching for `$in` lookups, so names need no regex scan.
+NAME_COLLATION = {"locale": "en", "strength": 2}
+
+COMPARE_FIELDS = [
+    ("Playtime", "total_playtime_ms", format_duration),
+    ("Joins", "total_joins", str),
+    ("Deaths", "total_deaths", str),
+    ("Player Kills", "player_kills", str),
+    ("Mob Kills", "mob_kills", str),
+    ("Blocks Broken", "blocks_broken", str),
+    ("Blocks Placed", "blocks_placed", str),
+    ("Advancements", "advancements", str),
+]
+
+
+@bot.command()
+async def compare(ctx, *names):
+    """
+    STACK: Stats
+    Compare several players side by side. All players and their duel
+    records are fetched with a single query per collection.
+
+    Args:
+        names: Player names to compare.
+    """
+    names = list(dict.fromkeys(names))
+    if len(names) < 2:
+        await ctx.reply("Usage: `$compare <name> <name> ...`")
+        return
+    if len(names) > MAX_COMPARE:
+        await ctx.reply(f"You can compare at most {MAX_COMPARE} players at once.")
+        return
+
+    await ping_stats()
+    query = {"name": {"$in": names}}
+    player_docs = {
+        doc["name"].lower(): doc
+        for doc in players.find(query, collation=NAME_COLLATION)
+    }
+    duel_docs = {
+        doc["name"].lower(): doc
+        for doc in duels_db.find(query, collation=NAME_COLLATION)
+    }
+
+    found = [player_docs[n.lower()] for n in names if n.lower() in player_docs]
+    missing = [n for n in names if n.lower() not in player_docs]
+
+    if len(found) < 2:
+        await ctx.reply("Need at least two known players to compare.")
+        return
+
+    leaders = {
+        key: max(doc.get(key, 0) for doc in found) for _, key, _ in COMPARE_FIELDS
+    }
+
+    embed = discord.Embed(
+        title="Player Comparison",
+        description=f"Not found: {', '.join(missing)}" if missing else None,
+        color=discord.Color.blurple(),
+        timestamp=datetime.now(timezone.utc),
+    )
+
+    for doc in found:
+        lines = []
+        for label, key, fmt in COMPARE_FIELDS:
+            value = doc.get(key, 0)
+            shown = fmt(value)
+            if value and value == leaders[key]:
+                shown = f"**{shown}**"
+            lines.append(f"{label}: {shown}")
+
+        duel = duel_docs.get(doc["name"].lower())
+        if duel:
+            wins = int(duel.get("wins", 0))
+            losses = int(duel.get("losses", 0))
+            lines.append(f"Duels: {wins}W / {losses}L")
+
+        embed.add_field(name=doc.get("name", "Unknown"), value="\n".join(lines))
+
+    embed.set_footer(text="Bold values lead the group.")
     await ctx.reply(embed=embed)
 
 
@@ -697,27 +1626,216 @@ async def duels(ctx, username: str = None):
     await ctx.reply(embed=embed)
 
 
-async def shutdown_server(manual=False):
+async def shutdown_server(server, manual=False, idle_seconds=0):
     """
     STACK: Server control
     Shuts down the minecraft server.
 
     Args:
+        server: Name of the server to shut down.
         manual: Whether the shutdown was manual or automatic (by polling).
+        idle_seconds: How long the server was empty, for automatic shutdowns.
+
+    Returns:
+        dict: Result of `halt_server`.
     """
     channel = discord.utils.get(bot.get_all_channels(), name="minecraft-chat")
-    if channel:
-        if manual:
-            pass
-            # await channel.send(embed=embed_manual_stop())
-        else:
-            await channel.send(embed=embed_auto_shutdown())
-        await stop_mc_server()
-        await channel.send(embed=embed_stopped())
-        await stop_vm()
-        await channel.send(embed=embed_vm_stop())
+
+    async def announce(phase):
+        if not channel:
+            return
+        if phase == "world_stopped":
+            await channel.send(embed=embed_stopped(server))
+        elif phase == "vm_stopped":
+            await channel.send(embed=embed_vm_stop(server))
+
+    if channel and not manual:
+        await channel.send(embed=embed_auto_shutdown(server, idle_seconds))
+
+    result = await halt_server(
+        server, trigger="command" if manual else "idle", on_phase=announce
+    )
+    if channel and result["forced"]:
+        await channel.send(embed=embed_forced_stop(server))
+    return result
+
+
+# ---- Slash commands -------------------------------------------------------
+# Each one defers straight away so Discord shows "thinking…", then edits
+# that response as the work progresses.
+
+COMMAND_HASH_PATH = ".command_tree_hash"
+
+BOOT_PROGRESS = {
+    "api_accepted": "☁️ Start request accepted, VM booting…",
+    "vm_running": "🖥️ VM running, waiting for Minecraft…",
+    "port_open": "🔌 Port open, world loading…",
+    "status_ok": "✅ Minecraft is answering.",
+}
+
+
+@bot.event
+async def setup_hook():
+    """
+    STACK: Discord Bot
+    Runs once before connecting; registers slash commands.
+    """
+    await sync_commands()
+
+
+async def sync_commands():
+    """
+    STACK: Discord Bot
+    Sync the slash command tree only if it changed since the last sync.
+    A hash of the payload is compared with the one saved after the last
+    sync, so routine restarts make no sync call and do not use up the
+    sync rate limit. With `bot.GUILD_ID` set, commands are registered in that
+    guild and appear instantly instead of after global propagation.
+    """
+    guild = discord.Object(id=int(GUILD_ID)) if GUILD_ID else None
+    if guild:
+        bot.tree.copy_global_to(guild=guild)
+
+    payload = [cmd.to_dict(bot.tree) for cmd in bot.tree.get_commands(guild=guild)]
+    digest = hashlib.sha256(
+        json.dumps([GUILD_ID, payload], sort_keys=True).encode()
+    ).hexdigest()
+
+    try:
+        with open(COMMAND_HASH_PATH) as f:
+            if f.read().strip() == digest:
+                print("[DISCORD BOT] Slash commands unchanged, skipping sync")
+                return
+    except FileNotFoundError:
+        pass
+
+    synced = await bot.tree.sync(guild=guild)
+    print(f"[DISCORD BOT] Synced {len(synced)} slash commands")
+    with open(COMMAND_HASH_PATH, "w") as f:
+        f.write(digest)
+
+
+@bot.tree.command(name="start", description="Start a Minecraft server")
+@app_commands.describe(server="Server to start (defaults to the main one)")
+async def slash_start(interaction: discord.Interaction, server: str | None = None):
+    """
+    STACK: Server control
+    Slash version of `$start`, reporting each boot phase as it completes.
+    """
+    name = get_server(server)
+    if name is None:
+        await interaction.response.send_message(
+            f"Unknown server.\nAvailable: {', '.join(SERVERS)}", ephemeral=True
+        )
+        return
+
+    if not is_admin(interaction):
+        state = server_state[name]
+        state["current_votes"] = set()
+        await interaction.response.send_message(embed=embed_vote_start(name))
+        vote_message = await interaction.original_response()
+        state["active_vote_message_id"] = vote_message.id
+        await vote_message.add_reaction(VOTE_EMOJI)
+        return
+
+    await interaction.response.defer(thinking=True)
+    await interaction.edit_original_response(embed=embed_starting(name))
+
+    async def progress(phase):
+        await interaction.edit_original_response(
+            content=BOOT_PROGRESS[phase], embed=embed_starting(name)
+        )
+
+    ready = await boot_server(name, trigger="command", on_phase=progress)
+    await interaction.edit_original_response(
+        content=None, embed=embed_started(name) if ready else embed_not_ready(name)
+    )
+
+
+stats_group = app_commands.Group(name="stats", description="Server and player stats")
+
+
+@stats_group.command(name="server", description="Latest server statistics")
+async def slash_stats_server(interaction: discord.Interaction):
+    """
+    STACK: Stats
+    Slash version of `$stats server`.
+    """
+    await interaction.response.defer(thinking=True)
+    result = await admit(stats_queue, interaction, ("server",), stats_server)
+    if result:
+        await interaction.edit_original_response(**{"content": None, **result})
+
+
+@stats_group.command(name="player", description="Statistics for one player")
+@app_commands.describe(name="Player name", span="Show recent progress, e.g. 7d")
+async def slash_stats_player(
+    interaction: discord.Interaction, name: str, span: str | None = None
+):
+    """
+    STACK: Stats
+    Slash version of `$stats player`.
+    """
+    days = None
+    if span is not None:
+        try:
+            days = span_days(span)
+        except ValueError as e:
+            await interaction.response.send_message(str(e), ephemeral=True)
+            return
+
+    await interaction.response.defer(thinking=True)
+    result = await admit(
+        stats_queue,
+        interaction,
+        ("player", name.lower(), days),
+        lambda: stats_player(name, days),
+    )
+    if result:
+        await interaction.edit_original_response(**{"content": None, **result})
+
+
+bot.tree.add_command(stats_group)
+
+
+@bot.tree.command(name="graph", description="Graph a server metric")
+@app_commands.describe(metric="Metric to plot", minutes="How far back to plot")
+@app_commands.choices(
+    metric=[app_commands.Choice(name=key, value=key) for key in GRAPH_METRICS]
+)
+async def slash_graph(
+    interaction: discord.Interaction,
+    metric: str,
+    minutes: app_commands.Range[int, 1, 10080] = 60,
+):
+    """
+    STACK: Stats
+    Slash version of `$graph`.
+    """
+    await interaction.response.defer(thinking=True)
+
+    col = GRAPH_METRICS[metric][0]
+    png = await admit(
+        graph_queue,
+        interaction,
+        (col, minutes),
+        lambda: render_graph(metric, minutes),
+    )
+    if png is None:
+        return
+    if not png:
+        await interaction.edit_original_response(
+            content="No data available for that time range."
+        )
+        return
+
+    await interaction.edit_original_response(
+        content=None,
+        attachments=[discord.File(io.BytesIO(png), filename=f"{col}.png")],
+    )
 
 
-threading.Thread(target=run_webserver, daemon=True).start()
+if __name__ == "__main__":
+    threading.Thread(target=run_webserver, daemon=True).start()
 
-bot.run(BOT_TOKEN)
+    bot.run(BOT_TOKEN)
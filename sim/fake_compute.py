@@ -0,0 +1,103 @@
+from collections import Counter
+import re
+import threading
+import time
+
+
+class FakeInstance:
+    def __init__(self, name, status="TERMINATED"):
+        self.name = name
+        self.status = status
+
+
+class FakeOperation:
+    """
+    Stand-in for a Compute Engine extended operation: `result()` blocks for
+    the simulated duration, then applies the state change.
+    """
+
+    def __init__(self, seconds, apply):
+        self._seconds = seconds
+        self._apply = apply
+        self._done = False
+        self._lock = threading.Lock()
+
+    def result(self, timeout=None):
+        time.sleep(self._seconds)
+        with self._lock:
+            if not self._done:
+                self._done = True
+                self._apply()
+
+
+class FakeInstancesClient:
+    """
+    STACK: Simulation
+    In-memory replacement for `compute_v1.InstancesClient`, covering the
+    calls the bot makes (`start`, `stop`, `get`, `list`). Install it with
+    `utils.set_instances_client`.
+
+    Args:
+        names: Instance names to create, all initially TERMINATED.
+        boot_seconds: How long a start operation takes.
+        stop_seconds: How long a stop operation takes.
+        latency: Simulated API round-trip per call.
+        on_start: Called with the instance name once it is RUNNING.
+        on_stop: Called with the instance name once it is TERMINATED.
+    """
+
+    def __init__(
+        self,
+        names,
+        boot_seconds=3.0,
+        stop_seconds=1.0,
+        latency=0.05,
+        on_start=None,
+        on_stop=None,
+    ):
+        self.instances = {name: FakeInstance(name) for name in names}
+        self.boot_seconds = boot_seconds
+        self.stop_seconds = stop_seconds
+        self.latency = latency
+        self.on_start = on_start
+        self.on_stop = on_stop
+        self.calls = Counter()
+
+    def _call(self, name):
+        self.calls[name] += 1
+        time.sleep(self.latency)
+
+    def start(self, project=None, zone=None, instance=None):
+        self._call("start")
+        vm = self.instances[instance]
+        if vm.status == "RUNNING":
+            return FakeOperation(0, lambda: None)
+        vm.status = "STAGING"
+
+        def apply():
+            vm.status = "RUNNING"
+            if self.on_start:
+                self.on_start(instance)
+
+        return FakeOperation(self.boot_seconds, apply)
+
+    def stop(self, project=None, zone=None, instance=None):
+        self._call("stop")
+        vm = self.instances[instance]
+        vm.status = "STOPPING"
+
+        def apply():
+            vm.status = "TERMINATED"
+            if self.on_stop:
+                self.on_stop(instance)
+
+        return FakeOperation(self.stop_seconds, apply)
+
+    def get(self, project=None, zone=None, instance=None):
+        self._call("get")
+        return self.instances[instance]
+
+    def list(self, request=None, project=None, zone=None):
+        self._call("list")
+        wanted = re.findall(r'name = "([^"]+)"', (request or {}).get("filter", ""))
+        return [vm for name, vm in self.instances.items() if not wanted or name in wanted]
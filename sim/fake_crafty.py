@@ -0,0 +1,76 @@
+from aiohttp import web
+import asyncio
+import json
+
+
+def make_crafty_app(worlds, cpu=12.5, mem_percent=35.0):
+    """
+    STACK: Simulation
+    aiohttp app implementing the parts of the Crafty API v2 the bot uses.
+
+    Args:
+        worlds: Crafty server id -> FakeWorld.
+        cpu: CPU percent to report while running.
+        mem_percent: Memory percent to report while running.
+    """
+    routes = web.RouteTableDef()
+
+    @routes.get("/api/v2/servers/{server_id}/stats")
+    async def stats(request):
+        world = worlds.get(request.match_info["server_id"])
+        if world is None:
+            return web.json_response({"status": "error"}, status=404)
+        running = world.running
+        players = [f"player{i}" for i in range(world.players if running else 0)]
+        return web.json_response(
+            {
+                "status": "ok",
+                "data": {
+                    "running": running,
+                    "online": len(players),
+                    "max": 20,
+                    "players": json.dumps(players),
+                    "cpu": cpu if running else 0,
+                    "mem": "1.2GB" if running else "0",
+                    "mem_percent": mem_percent if running else 0,
+                },
+            }
+        )
+
+    @routes.post("/api/v2/servers/{server_id}/action/{action}")
+    async def action(request):
+        world = worlds.get(request.match_info["server_id"])
+        if world is None:
+            return web.json_response({"status": "error"}, status=404)
+
+        name = request.match_info["action"]
+        if name == "stop_server":
+
+            async def save_and_exit():
+                await asyncio.sleep(world.save_seconds)
+                world.stop()
+
+            asyncio.get_running_loop().create_task(save_and_exit())
+        elif name == "start_server":
+            world.start()
+        else:
+            return web.json_response({"status": "error"}, status=400)
+        return web.json_response({"status": "ok"})
+
+    app = web.Application()
+    app.add_routes(routes)
+    return app
+
+
+async def serve_crafty(worlds, host="127.0.0.1", port=8443):
+    """
+    STACK: Simulation
+    Start the fake Crafty API over plain HTTP.
+
+    Returns:
+        web.AppRunner: Call `cleanup()` on it to stop serving.
+    """
+    runner = web.AppRunner(make_crafty_app(worlds))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
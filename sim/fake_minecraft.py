@@ -0,0 +1,138 @@
+import asyncio
+import json
+import random
+import time
+
+
+class FakeWorld:
+    """
+    STACK: Simulation
+    Shared state for one simulated Minecraft server, read by the fake status
+    responder and the fake Crafty API.
+
+    Args:
+        load_seconds: Time from process start until status pings succeed.
+        save_seconds: Time a stop request takes to save and exit.
+        players: Players online while running.
+    """
+
+    def __init__(self, load_seconds=2.0, save_seconds=1.0, players=0):
+        self.load_seconds = load_seconds
+        self.save_seconds = save_seconds
+        self.players = players
+        self.running = False
+        self.ready_at = None
+
+    def start(self):
+        self.running = True
+        self.ready_at = time.monotonic() + self.load_seconds
+
+    def stop(self):
+        self.running = False
+        self.ready_at = None
+
+    @property
+    def ready(self):
+        return self.running and time.monotonic() >= self.ready_at
+
+
+async def _read_varint(reader, first=None):
+    value = 0
+    for shift in range(0, 35, 7):
+        if first is not None:
+            byte, first = first[0], None
+        else:
+            byte = (await reader.readexactly(1))[0]
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value
+    raise ValueError("VarInt too long")
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        out.append(byte | (0x80 if value else 0))
+        if not value:
+            return bytes(out)
+
+
+def _packet(packet_id, payload):
+    body = _varint(packet_id) + payload
+    return _varint(len(body)) + body
+
+
+def _status_json(world):
+    return json.dumps(
+        {
+            "version": {"name": "1.21.1", "protocol": 767},
+            "players": {"max": 20, "online": world.players},
+            "description": {"text": "PESU MC (simulated)"},
+        }
+    ).encode()
+
+
+async def _handle_http(reader, writer):
+    # `ping_stats` hits http://SERVER_IP/mc/stats; answer it on the same port.
+    await reader.readuntil(b"\r\n\r\n")
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\nok")
+    await writer.drain()
+
+
+async def _handle_status(world, reader, writer, first):
+    await _read_varint(reader, first)  # handshake length
+    await _read_varint(reader)  # handshake id
+    await _read_varint(reader)  # protocol version
+    host_len = await _read_varint(reader)
+    await reader.readexactly(host_len + 2)  # host, port
+    await _read_varint(reader)  # next state
+
+    await _read_varint(reader)  # status request length
+    await _read_varint(reader)  # status request id
+    payload = _status_json(world)
+    writer.write(_packet(0x00, _varint(len(payload)) + payload))
+    await writer.drain()
+
+    await _read_varint(reader)  # ping length
+    await _read_varint(reader)  # ping id
+    token = await reader.readexactly(8)
+    writer.write(_packet(0x01, token))
+    await writer.drain()
+
+
+async def serve_minecraft(world, host="127.0.0.1", port=25599, jitter=0.0):
+    """
+    STACK: Simulation
+    Start a TCP server that answers Minecraft status pings (handshake, status,
+    ping) while `world` is ready, and plain HTTP GETs for the stats endpoint.
+
+    The port is always open. Readiness is modelled by whether a status reply
+    comes back, which is what the bot's probes depend on.
+
+    Args:
+        world: FakeWorld to report.
+        host: Bind address.
+        port: Bind port.
+        jitter: Maximum random delay added before each reply, in seconds.
+
+    Returns:
+        asyncio.Server
+    """
+
+    async def handle(reader, writer):
+        try:
+            if jitter:
+                await asyncio.sleep(random.uniform(0, jitter))
+            first = await reader.readexactly(1)
+            if first == b"G":
+                await _handle_http(reader, writer)
+            elif world.ready:
+                await _handle_status(world, reader, writer, first)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
@@ -0,0 +1,292 @@
+"""
+Offline load generator for the bot's command handlers and control loop.
+
+Runs the real handlers from `main.py` against local stand-ins: a fake
+Compute Engine client, a fake Crafty API, a fake Minecraft status responder
+and a local MongoDB (see `sim/docker-compose.yml`). Discord is replaced by
+minimal context objects that time each reply.
+
+    docker compose -f sim/docker-compose.yml up -d
+    python -m sim.loadgen --seed --requests 500 --burst 25
+
+Reports throughput, per-command latency percentiles and event-loop lag.
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("CONFIG_PATH", "sim/config.yaml")
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/?directConnection=true")
+os.environ.setdefault("MONGO_DB", "pesu_mc_sim")
+os.environ.setdefault("CRAFTY_TOKEN", "sim")
+os.environ.setdefault("STATS_TOKEN", "sim")
+
+import utils  # noqa: E402
+import crafty  # noqa: E402
+from sim.fake_compute import FakeInstancesClient  # noqa: E402
+from sim.fake_minecraft import FakeWorld, serve_minecraft  # noqa: E402
+from sim.fake_crafty import serve_crafty  # noqa: E402
+
+ADMIN_ROLE_ID = 1
+_ids = itertools.count(1000)
+# Channel id -> FakeChannel, served to the bot's `get_channel`.
+channels = {}
+
+
+class FakeRole:
+    def __init__(self, role_id):
+        self.id = role_id
+
+
+class FakeUser:
+    def __init__(self, user_id, admin=False):
+        self.id = user_id
+        self.bot = False
+        self.roles = [FakeRole(ADMIN_ROLE_ID)] if admin else []
+
+
+class FakeGuild:
+    def __init__(self, guild_id):
+        self.id = guild_id
+        self.filesize_limit = 25 * 1024**2
+
+
+class FakeChannel:
+    def __init__(self, on_send):
+        self._on_send = on_send
+
+    async def send(self, *args, **kwargs):
+        return self._on_send()
+
+
+class FakeMessage:
+    def __init__(self, channel):
+        self.id = next(_ids)
+        self.channel = channel
+
+    async def add_reaction(self, emoji):
+        pass
+
+
+class FakeReactionPayload:
+    """
+    Stand-in for `discord.RawReactionActionEvent`.
+    """
+
+    def __init__(self, message, channel_id, member, emoji):
+        self.message_id = message.id
+        self.channel_id = channel_id
+        self.user_id = member.id
+        self.member = member
+        self.emoji = emoji
+
+
+class FakeCtx:
+    """
+    Minimal stand-in for `commands.Context`: records when each reply lands.
+    """
+
+    def __init__(self, user, guild):
+        self.author = user
+        self.guild = guild
+        self.replies = []
+        self.channel = FakeChannel(self._record)
+
+    def _record(self):
+        self.replies.append(time.perf_counter())
+        return FakeMessage(self.channel)
+
+    async def reply(self, *args, **kwargs):
+        return self._record()
+
+
+def workload(main):
+    """
+    Weighted mix of requests: name -> (weight, coroutine factory taking ctx).
+    """
+    names = [f"player{n}" for n in range(20)]
+    metrics = ["players", "cpu", "heap", "chunks"]
+    return {
+        "stats_server": (30, lambda ctx: main.stats.callback(ctx, "server")),
+        "stats_player": (
+            20,
+            lambda ctx: main.stats.callback(ctx, "player", random.choice(names)),
+        ),
+        "graph": (
+            15,
+            lambda ctx: main.graph.callback(
+                ctx, random.choice(metrics), random.choice([60, 360, 1440])
+            ),
+        ),
+        "duels": (20, lambda ctx: main.duels.callback(ctx, random.choice(names))),
+        "compare": (
+            10,
+            lambda ctx: main.compare.callback(ctx, *random.sample(names, 3)),
+        ),
+        "vote": (5, lambda ctx: run_vote(main, ctx)),
+    }
+
+
+async def run_vote(main, ctx):
+    """
+    Start a vote as a non-admin, then react until it passes, which boots the
+    simulated server through the real start pipeline.
+    """
+    await main.start.callback(ctx)
+    vote_id = main.server_state[utils.DEFAULT_SERVER]["active_vote_message_id"]
+    if vote_id is None:
+        return
+    message = FakeMessage(ctx.channel)
+    message.id = vote_id
+    channel_id = next(_ids)
+    channels[channel_id] = ctx.channel
+    try:
+        for voter in range(main.REQUIRED_VOTES):
+            await main.on_raw_reaction_add(
+                FakeReactionPayload(
+                    message, channel_id, FakeUser(10_000 + voter), main.VOTE_EMOJI
+                )
+            )
+    finally:
+        channels.pop(channel_id, None)
+
+
+async def sample_loop_lag(samples, stop, interval=0.05):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def run_control_loop(main, stop, tick):
+    while not stop.is_set():
+        await main.check_server.coro()
+        await asyncio.sleep(tick)
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run(args):
+    world = FakeWorld(players=args.players)
+    server = utils.SERVERS[utils.DEFAULT_SERVER]
+    host, port = server["SERVER_IP"].split(":")
+
+    client = FakeInstancesClient(
+        [server["INSTANCE_NAME"]],
+        boot_seconds=args.boot_seconds,
+        on_start=lambda _: world.start(),
+        on_stop=lambda _: world.stop(),
+    )
+    utils.set_instances_client(client)
+
+    mc = await serve_minecraft(world, host, int(port))
+    crafty_runner = await serve_crafty({server["SERVER_ID"]: world})
+
+    import main
+
+    main.bot.get_channel = channels.get
+
+    if args.seed:
+        from sim.seed import seed
+
+        await asyncio.to_thread(seed, args.seed_days)
+
+    mix = workload(main)
+    kinds = list(mix)
+    weights = [mix[k][0] for k in kinds]
+
+    latencies = {k: [] for k in kinds}
+    errors = {k: 0 for k in kinds}
+    lag = []
+    stop = asyncio.Event()
+    background = [
+        asyncio.create_task(sample_loop_lag(lag, stop)),
+        asyncio.create_task(run_control_loop(main, stop, args.tick)),
+    ]
+
+    async def one(kind, user, guild):
+        ctx = FakeCtx(user, guild)
+        start = time.perf_counter()
+        try:
+            await mix[kind][1](ctx)
+        except Exception as e:
+            errors[kind] += 1
+            print(f"[SIM] {kind} failed: {type(e).__name__}: {e}")
+            return
+        end = ctx.replies[-1] if ctx.replies else time.perf_counter()
+        latencies[kind].append(end - start)
+
+    guilds = [FakeGuild(g) for g in range(args.guilds)]
+    users = [FakeUser(u, admin=False) for u in range(1, args.users + 1)]
+
+    started = time.perf_counter()
+    tasks = []
+    for sent in range(0, args.requests, args.burst):
+        for _ in range(min(args.burst, args.requests - sent)):
+            kind = random.choices(kinds, weights)[0]
+            tasks.append(
+                asyncio.create_task(
+                    one(kind, random.choice(users), random.choice(guilds))
+                )
+            )
+        await asyncio.sleep(args.interval)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await asyncio.gather(*background, return_exceptions=True)
+    mc.close()
+    await crafty.close_session()
+    await crafty_runner.cleanup()
+
+    done = sum(len(v) for v in latencies.values())
+    print(f"\nRequests: {done} ok, {sum(errors.values())} failed in {elapsed:.1f}s")
+    print(f"Throughput: {done / elapsed:.1f} req/s\n")
+    print(f"{'command':<14}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind in kinds:
+        values = [v * 1000 for v in latencies[kind]]
+        if not values:
+            continue
+        print(
+            f"{kind:<14}{len(values):>6}"
+            f"{statistics.median(values):>10.1f}"
+            f"{percentile(values, 95):>10.1f}"
+            f"{percentile(values, 99):>10.1f}"
+            f"{max(values):>10.1f}"
+        )
+
+    lag_ms = [v * 1000 for v in lag]
+    print(
+        f"\nLoop lag ms: p50 {statistics.median(lag_ms):.1f}  "
+        f"p99 {percentile(lag_ms, 99):.1f}  max {max(lag_ms):.1f}"
+    )
+    print(f"Compute API calls: {dict(client.calls)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--burst", type=int, default=20, help="requests per burst")
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between bursts")
+    parser.add_argument("--users", type=int, default=40)
+    parser.add_argument("--guilds", type=int, default=2)
+    parser.add_argument("--players", type=int, default=3, help="simulated players online")
+    parser.add_argument("--boot-seconds", type=float, default=2.0)
+    parser.add_argument("--tick", type=float, default=10.0, help="check_server period")
+    parser.add_argument("--seed", action="store_true", help="seed Mongo first")
+    parser.add_argument("--seed-days", type=float, default=3)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
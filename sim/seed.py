@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+import math
+import random
+
+from stats.mongo import server_metrics, players, duels_db
+
+INTERVAL_SECONDS = 10
+INSERT_BATCH = 5000
+
+
+def _metric_doc(ts, i, player_count):
+    return {
+        "timestamp": ts,
+        "player_count": player_count,
+        "loaded_chunks": 400 + 150 * player_count + random.randint(0, 50),
+        "cpu_system_pct": min(100.0, 8 + 9 * player_count + random.uniform(0, 5)),
+        "cpu_jvm_pct": min(100.0, 5 + 8 * player_count + random.uniform(0, 4)),
+        "ram_system_used": 3.2 * 1024**3,
+        "ram_system_total": 8 * 1024**3,
+        "jvm_heap_used": (1.5 + 0.2 * player_count) * 1024**3,
+        "jvm_heap_max": 4 * 1024**3,
+        "jvm_rss_used": 2.8 * 1024**3,
+        "total_joins": i // 360,
+        "total_unique_joins": 40,
+        "total_deaths": i // 900,
+        "uptime_ms": i * INTERVAL_SECONDS * 1000,
+        "total_runtime_ms": i * INTERVAL_SECONDS * 1000,
+    }
+
+
+def seed(days=3, player_names=20):
+    """
+    STACK: Simulation
+    Fill the configured database with synthetic metrics, players and duels.
+    Metrics follow a daily cycle with evening peaks.
+
+    Args:
+        days: Days of 10 s metric samples to generate.
+        player_names: Number of players to create.
+    """
+    server_metrics.create_index("timestamp")
+    now = datetime.utcnow()
+    start = now - timedelta(days=days)
+
+    batch = []
+    total = int(days * 86400 / INTERVAL_SECONDS)
+    for i in range(total):
+        ts = start + timedelta(seconds=i * INTERVAL_SECONDS)
+        hour = (ts.hour + 5.5) % 24
+        expected = max(0.0, 4 * math.sin((hour - 12) / 24 * 2 * math.pi))
+        batch.append(_metric_doc(ts, i, max(0, round(random.gauss(expected, 0.7)))))
+        if len(batch) >= INSERT_BATCH:
+            server_metrics.insert_many(batch)
+            batch = []
+    if batch:
+        server_metrics.insert_many(batch)
+
+    for n in range(player_names):
+        name = f"player{n}"
+        players.update_one(
+            {"name": name},
+            {
+                "$set": {
+                    "uuid": f"00000000-0000-0000-0000-{n:012d}",
+                    "online": False,
+                    "total_playtime_ms": random.randint(1, 200) * 3_600_000,
+                    "total_joins": random.randint(1, 300),
+                    "total_deaths": random.randint(0, 200),
+                    "player_kills": random.randint(0, 50),
+                    "mob_kills": random.randint(0, 5000),
+                    "blocks_broken": random.randint(0, 100000),
+                    "blocks_placed": random.randint(0, 100000),
+                    "villager_trades": random.randint(0, 300),
+                    "animals_bred": random.randint(0, 300),
+                    "advancements": random.randint(0, 120),
+                    "messages_sent": random.randint(0, 3000),
+                    "first_join_ts": int((now - timedelta(days=60)).timestamp() * 1000),
+                    "last_seen_ts": int(now.timestamp() * 1000),
+                }
+            },
+            upsert=True,
+        )
+        wins, losses = random.randint(0, 40), random.randint(0, 40)
+        duels_db.update_one(
+            {"name": name},
+            {
+                "$set": {
+                    "wins": wins,
+                    "losses": losses,
+                    "total_matches": wins + losses,
+                    "rating": {"sword": 1000 + random.randint(-200, 400)},
+                }
+            },
+            upsert=True,
+        )
+
+    print(f"[SIM] Seeded {total} metric samples and {player_names} players")
+
+
+if __name__ == "__main__":
+    seed()
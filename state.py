@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from stats.mongo import bot_state
+
+
+class StateStore:
+    """
+    STACK: Bot state
+    Single Mongo document holding the bot's in-memory control state, written
+    behind the scenes. Callers `stage` a snapshot as often as they like;
+    `flush` only writes when the snapshot differs from the last one written,
+    so a quiet bot makes no writes at all.
+
+    Args:
+        collection: Collection holding the state document.
+        doc_id: `_id` of the state document.
+    """
+
+    def __init__(self, collection=bot_state, doc_id="bot"):
+        self.collection = collection
+        self.doc_id = doc_id
+        self._pending = None
+        self._written = None
+
+    def load(self):
+        """
+        Read the saved state. Blocking; run it in a thread.
+
+        Returns:
+            dict | None: The saved snapshot plus `saved_at`, or None.
+        """
+        doc = self.collection.find_one({"_id": self.doc_id})
+        if doc is None:
+            return None
+        doc.pop("_id", None)
+        self._written = {k: v for k, v in doc.items() if k != "saved_at"}
+        return doc
+
+    def stage(self, snapshot):
+        """
+        Remember the latest snapshot for the next flush.
+        """
+        self._pending = snapshot
+
+    def flush(self):
+        """
+        Write the staged snapshot if it changed. Blocking; run it in a thread.
+
+        Returns:
+            bool: Whether anything was written.
+        """
+        snapshot = self._pending
+        if snapshot is None or snapshot == self._written:
+            return False
+        self.collection.replace_one(
+            {"_id": self.doc_id},
+            {**snapshot, "saved_at": datetime.utcnow()},
+            upsert=True,
+        )
+        self._written = snapshot
+        return True
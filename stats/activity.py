@@ -0,0 +1,187 @@
+from stats.mongo import server_metrics, activity_stats
+from stats.graphs import plot_heatmap
+from datetime import timedelta
+import threading
+
+
+BUCKETS = 7 * 24
+ACCUMULATOR_ID = "hour_of_week"
+# Buckets are in server-local time so "Friday 21:00" means what players expect.
+UTC_OFFSET = timedelta(hours=5, minutes=30)
+FOLD_BATCH_SIZE = 5000
+
+_accumulator = None
+_fold_lock = threading.Lock()
+# Rendered heatmap, reused until the accumulator's watermark moves.
+_heatmap_cache = {"watermark": None, "png": None}
+
+
+def _local(ts):
+    return ts + UTC_OFFSET
+
+
+def _week_index(ts):
+    # Monday-aligned week number; `toordinal` starts at Monday 0001-01-01.
+    return (_local(ts).toordinal() - 1) // 7
+
+
+def bucket_of(ts):
+    """
+    Hour-of-week bucket (0 = Monday 00:00 local) for a UTC timestamp.
+
+    Args:
+        ts: Naive UTC datetime, as stored in `server_metrics`.
+    """
+    local = _local(ts)
+    return local.weekday() * 24 + local.hour
+
+
+def _empty_accumulator():
+    return {
+        "_id": ACCUMULATOR_ID,
+        "first": None,
+        "watermark": None,
+        # Metric samples seen in the bucket, and the sum of their player counts.
+        "samples": [0] * BUCKETS,
+        "players": [0] * BUCKETS,
+        # Number of distinct weeks in which the bucket had at least one player.
+        "hits": [0] * BUCKETS,
+        "last_hit_week": [-1] * BUCKETS,
+    }
+
+
+def _load():
+    global _accumulator
+    if _accumulator is None:
+        doc = activity_stats.find_one({"_id": ACCUMULATOR_ID})
+        if doc is None:
+            doc = _empty_accumulator()
+            activity_stats.insert_one(doc)
+        _accumulator = doc
+    return _accumulator
+
+
+def update_activity():
+    """
+    Fold every `server_metrics` sample newer than the stored watermark into
+    the hour-of-week accumulator. Each call only reads the new samples, and
+    writes back only the buckets they touched. Blocking; run it in a thread.
+
+    Returns:
+        dict: The up-to-date accumulator document.
+    """
+    with _fold_lock:
+        return _fold()
+
+
+def _fold():
+    acc = _load()
+
+    query = {"player_count": {"$exists": True}}
+    if acc["watermark"] is not None:
+        query["timestamp"] = {"$gt": acc["watermark"]}
+
+    cursor = (
+        server_metrics.find(query, {"timestamp": 1, "player_count": 1})
+        .sort("timestamp", 1)
+        .batch_size(FOLD_BATCH_SIZE)
+    )
+
+    inc = {}
+    changed_weeks = {}
+    watermark = None
+
+    for doc in cursor:
+        ts = doc["timestamp"]
+        count = doc.get("player_count") or 0
+        b = bucket_of(ts)
+
+        acc["samples"][b] += 1
+        acc["players"][b] += count
+        inc[f"samples.{b}"] = inc.get(f"samples.{b}", 0) + 1
+        inc[f"players.{b}"] = inc.get(f"players.{b}", 0) + count
+
+        if count > 0:
+            week = _week_index(ts)
+            if acc["last_hit_week"][b] != week:
+                acc["last_hit_week"][b] = week
+                acc["hits"][b] += 1
+                inc[f"hits.{b}"] = inc.get(f"hits.{b}", 0) + 1
+                changed_weeks[f"last_hit_week.{b}"] = week
+
+        if acc["first"] is None:
+            acc["first"] = ts
+        watermark = ts
+
+    if watermark is None:
+        return acc
+
+    acc["watermark"] = watermark
+    activity_stats.update_one(
+        {"_id": ACCUMULATOR_ID},
+        {
+            "$inc": inc,
+            "$set": {**changed_weeks, "first": acc["first"], "watermark": watermark},
+        },
+    )
+    return acc
+
+
+def weeks_observed(acc):
+    """
+    Number of (possibly partial) weeks covered by the accumulator.
+    """
+    if acc["first"] is None:
+        return 0
+    return _week_index(acc["watermark"]) - _week_index(acc["first"]) + 1
+
+
+def demand_probability(acc, bucket):
+    """
+    Fraction of observed weeks in which anyone was online during the bucket.
+
+    Args:
+        acc: Accumulator from `update_activity`.
+        bucket: Hour-of-week bucket.
+
+    Returns:
+        float | None: Probability, or None when there is no history yet.
+    """
+    weeks = weeks_observed(acc)
+    if weeks == 0:
+        return None
+    return acc["hits"][bucket] / weeks
+
+
+def average_players(acc):
+    """
+    Average `player_count` per bucket while the server was running.
+
+    Returns:
+        list[float]: 168 values, 0.0 where there are no samples.
+    """
+    return [
+        (p / n) if n else 0.0 for p, n in zip(acc["players"], acc["samples"])
+    ]
+
+
+def activity_heatmap():
+    """
+    Hour-of-week heatmap of average players online, as PNG bytes. The
+    accumulator is brought up to date first, and the image is only
+    re-rendered when new samples arrived. Blocking; run it in a thread.
+
+    Returns:
+        bytes | None: PNG data, or None when there is no history yet.
+    """
+    acc = update_activity()
+    if acc["watermark"] is None:
+        return None
+
+    if _heatmap_cache["watermark"] != acc["watermark"]:
+        _heatmap_cache["png"] = plot_heatmap(
+            average_players(acc),
+            title="Average Players Online · hour of week (IST)",
+        )
+        _heatmap_cache["watermark"] = acc["watermark"]
+    return _heatmap_cache["png"]
@@ -0,0 +1,137 @@
+import math
+
+
+def _heap_ratio(doc):
+    used = doc.get("jvm_heap_used")
+    limit = doc.get("jvm_heap_max")
+    if used is None or not limit:
+        return None
+    return used / limit
+
+
+# name -> (label, extractor, hard limit or None, minimum deviation, value format)
+# The minimum deviation keeps a quiet, flat baseline from turning ordinary
+# noise into a huge z-score.
+SIGNALS = {
+    "heap": ("JVM heap usage", _heap_ratio, 0.92, 0.05, "{:.0%}"),
+    "cpu_system": (
+        "System CPU",
+        lambda d: d.get("cpu_system_pct"),
+        95.0,
+        5.0,
+        "{:.1f}%",
+    ),
+    "cpu_jvm": ("JVM CPU", lambda d: d.get("cpu_jvm_pct"), 95.0, 5.0, "{:.1f}%"),
+    "chunks": (
+        "Loaded chunks",
+        lambda d: d.get("loaded_chunks"),
+        None,
+        100.0,
+        "{:.0f}",
+    ),
+}
+
+
+def _band(doc):
+    # Player-count band: 0, 1, 2-3, 4-7, 8+. Load follows the player count, so
+    # each band learns its own baseline and a join is not an anomaly.
+    return min((doc.get("player_count") or 0).bit_length(), 4)
+
+
+class AnomalyDetector:
+    """
+    STACK: Stats
+    Streaming detector over `server_metrics` documents. Each signal keeps an
+    exponentially weighted mean and variance per player-count band, so every
+    sample is O(1) and no history is re-read. A signal alerts when it is
+    above its hard limit, or more than `z_threshold` deviations above its
+    band's running mean, for `sustain` consecutive samples. Each band warms
+    up on its own, so the first visit to a new player count only alerts on
+    hard limits. Repeat alerts for the same signal are suppressed for
+    `suppress_seconds`.
+
+    Args:
+        alpha: EWMA weight of the newest sample.
+        z_threshold: Deviations above the mean that count as anomalous.
+        warmup: Samples to learn from before z-score alerts are allowed.
+        sustain: Consecutive anomalous samples needed to alert.
+        suppress_seconds: Quiet period after an alert, per signal.
+    """
+
+    def __init__(
+        self, alpha=0.05, z_threshold=4.0, warmup=60, sustain=3, suppress_seconds=900
+    ):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.warmup = warmup
+        self.sustain = sustain
+        self.suppress_seconds = suppress_seconds
+        self.state = {
+            name: {"baselines": {}, "streak": 0, "last_alert": None}
+            for name in SIGNALS
+        }
+
+    def update(self, doc):
+        """
+        Fold one document into the running state.
+
+        Args:
+            doc: A `server_metrics` document.
+
+        Returns:
+            list[dict]: Alerts raised by this sample.
+        """
+        ts = doc.get("timestamp")
+        band = _band(doc)
+        alerts = []
+
+        for name, (label, extract, limit, min_std, fmt) in SIGNALS.items():
+            value = extract(doc)
+            if value is None:
+                continue
+            s = self.state[name]
+            b = s["baselines"].setdefault(band, {"mean": 0.0, "var": 0.0, "n": 0})
+
+            std = max(math.sqrt(b["var"]), min_std)
+            z = (value - b["mean"]) / std
+            over_limit = limit is not None and value >= limit
+            spiking = b["n"] >= self.warmup and z >= self.z_threshold
+
+            if over_limit or spiking:
+                s["streak"] += 1
+            else:
+                s["streak"] = 0
+
+            if s["streak"] >= self.sustain and not self._suppressed(s, ts):
+                s["last_alert"] = ts
+                alerts.append(
+                    {
+                        "signal": name,
+                        "label": label,
+                        "value": fmt.format(value),
+                        "baseline": fmt.format(b["mean"]),
+                        "reason": "above limit" if over_limit else f"{z:.1f}σ spike",
+                    }
+                )
+
+            # Hold the baseline while a streak builds so a step change is not
+            # absorbed before it can alert; afterwards a new steady level is
+            # learned and stops alerting.
+            if 0 < s["streak"] < self.sustain:
+                continue
+
+            diff = value - b["mean"] if b["n"] else 0.0
+            if b["n"] == 0:
+                b["mean"] = float(value)
+            else:
+                incr = self.alpha * diff
+                b["mean"] += incr
+                b["var"] = (1 - self.alpha) * (b["var"] + diff * incr)
+            b["n"] += 1
+
+        return alerts
+
+    def _suppressed(self, s, ts):
+        if s["last_alert"] is None or ts is None:
+            return False
+        return (ts - s["last_alert"]).total_seconds() < self.suppress_seconds
@@ -0,0 +1,271 @@
+from stats.mongo import server_metrics, players, duels_db
+from datetime import datetime, timedelta
+import csv
+import io
+import json
+import os
+import re
+import time
+import zlib
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is optional.
+    pa = None
+    pq = None
+
+
+BATCH_SIZE = 1000
+
+# Column types. Values that do not fit their type are exported as empty.
+STR = "str"
+INT = "int"
+FLOAT = "float"
+BOOL = "bool"
+TIME = "datetime"
+JSON = "json"  # nested values, written as a JSON string
+
+_METRIC_COLUMNS = [
+    ("_id", STR),
+    ("timestamp", TIME),
+    ("player_count", INT),
+    ("loaded_chunks", INT),
+    ("cpu_system_pct", FLOAT),
+    ("cpu_jvm_pct", FLOAT),
+    ("ram_system_used", FLOAT),
+    ("ram_system_total", FLOAT),
+    ("jvm_heap_used", FLOAT),
+    ("jvm_heap_max", FLOAT),
+    ("jvm_rss_used", FLOAT),
+    ("total_joins", INT),
+    ("total_unique_joins", INT),
+    ("total_deaths", INT),
+    ("uptime_ms", INT),
+    ("total_runtime_ms", INT),
+]
+
+_PLAYER_COLUMNS = [
+    ("_id", STR),
+    ("uuid", STR),
+    ("name", STR),
+    ("online", BOOL),
+    ("first_join_ts", INT),
+    ("last_seen_ts", INT),
+    ("total_playtime_ms", INT),
+    ("total_joins", INT),
+    ("total_deaths", INT),
+    ("player_kills", INT),
+    ("mob_kills", INT),
+    ("blocks_broken", INT),
+    ("blocks_placed", INT),
+    ("villager_trades", INT),
+    ("animals_bred", INT),
+    ("advancements", INT),
+    ("messages_sent", INT),
+]
+
+_DUEL_COLUMNS = [
+    ("_id", STR),
+    ("name", STR),
+    ("wins", INT),
+    ("losses", INT),
+    ("total_matches", INT),
+    ("last_match_ts", INT),
+    ("rating", JSON),
+]
+
+# Collection name -> (collection, time field, time field type, columns)
+EXPORTS = {
+    "server_metrics": (server_metrics, "timestamp", "datetime", _METRIC_COLUMNS),
+    "players": (players, "last_seen_ts", "ms", _PLAYER_COLUMNS),
+    "duels": (duels_db, None, None, _DUEL_COLUMNS),
+}
+
+FORMATS = ("csv", "parquet")
+
+RANGE_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+
+def parse_range(text):
+    """
+    Parse a range like `30m`, `24h`, `7d` or `2w`.
+
+    Args:
+        text: Range string, or None or `all` for everything.
+
+    Returns:
+        timedelta | None
+
+    Raises:
+        ValueError: If the range is malformed.
+    """
+    if text is None or text.lower() == "all":
+        return None
+    match = re.fullmatch(r"(\d+)([mhdw])", text.lower())
+    if not match:
+        raise ValueError(f"Invalid range: {text}")
+    return timedelta(**{RANGE_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def _cursor(name, span):
+    collection, field, kind, columns = EXPORTS[name]
+    query = {}
+    if span is not None and field is not None:
+        if kind == "ms":
+            since = int((time.time() - span.total_seconds()) * 1000)
+        else:
+            since = datetime.utcnow() - span
+        query[field] = {"$gte": since}
+
+    projection = {column: 1 for column, _ in columns}
+    cursor = collection.find(query, projection).batch_size(BATCH_SIZE)
+    if field is not None:
+        cursor = cursor.sort(field, 1)
+    return cursor
+
+
+def _cell(value, kind):
+    if value is None:
+        return None
+    try:
+        if kind == STR:
+            return str(value)
+        if kind == INT:
+            return int(value)
+        if kind == FLOAT:
+            return float(value)
+        if kind == BOOL:
+            return bool(value)
+        if kind == TIME:
+            return value if isinstance(value, datetime) else None
+        return json.dumps(value, default=str)
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def _batches(name, span):
+    """
+    Yield rows in lists of at most `BATCH_SIZE`, so only one batch is ever
+    held in memory. Rows have exactly the collection's declared columns.
+    """
+    columns = EXPORTS[name][3]
+    batch = []
+    for doc in _cursor(name, span):
+        row = {column: _cell(doc.get(column), kind) for column, kind in columns}
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def iter_csv_gz(name, span):
+    """
+    Stream a collection as gzip-compressed CSV with the collection's declared
+    columns; missing fields are left empty. Nothing is yielded when there
+    are no rows.
+
+    Args:
+        name: Collection name from `EXPORTS`.
+        span: timedelta to export, or None for everything.
+
+    Yields:
+        bytes: Compressed chunks.
+    """
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    buf = io.StringIO()
+    columns = [column for column, _ in EXPORTS[name][3]]
+    writer = csv.DictWriter(buf, fieldnames=columns)
+    wrote_header = False
+
+    for batch in _batches(name, span):
+        if not wrote_header:
+            writer.writeheader()
+            wrote_header = True
+        writer.writerows(batch)
+
+        chunk = compressor.compress(buf.getvalue().encode())
+        buf.seek(0)
+        buf.truncate()
+        if chunk:
+            yield chunk
+
+    if wrote_header:
+        yield compressor.flush()
+
+
+def _arrow_schema(name):
+    types = {
+        STR: pa.string(),
+        INT: pa.int64(),
+        FLOAT: pa.float64(),
+        BOOL: pa.bool_(),
+        TIME: pa.timestamp("ms"),
+        JSON: pa.string(),
+    }
+    return pa.schema([(column, types[kind]) for column, kind in EXPORTS[name][3]])
+
+
+def write_parquet(name, span, path):
+    """
+    Write a collection to a Parquet file one row group per batch, using the
+    collection's declared schema.
+
+    Args:
+        name: Collection name from `EXPORTS`.
+        span: timedelta to export, or None for everything.
+        path: Destination file.
+
+    Returns:
+        bool: False when there was nothing to export.
+
+    Raises:
+        RuntimeError: If pyarrow is not installed.
+    """
+    if pa is None:
+        raise RuntimeError("Parquet export requires pyarrow")
+
+    schema = _arrow_schema(name)
+    writer = None
+    try:
+        for batch in _batches(name, span):
+            if writer is None:
+                writer = pq.ParquetWriter(path, schema, compression="zstd")
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return writer is not None
+
+
+def export_to_file(name, span, fmt="csv"):
+    """
+    Export a collection to a file under /tmp.
+
+    Args:
+        name: Collection name from `EXPORTS`.
+        span: timedelta to export, or None for everything.
+        fmt: `csv` (gzip-compressed) or `parquet`.
+
+    Returns:
+        str | None: The file path, or None when there was nothing to export.
+    """
+    stamp = int(time.time())
+    if fmt == "parquet":
+        path = f"/tmp/{name}_{stamp}.parquet"
+        if write_parquet(name, span, path):
+            return path
+        return None
+
+    path = f"/tmp/{name}_{stamp}.csv.gz"
+    wrote_rows = False
+    with open(path, "wb") as f:
+        for chunk in iter_csv_gz(name, span):
+            f.write(chunk)
+            wrote_rows = True
+    if not wrote_rows:
+        os.remove(path)
+        return None
+    return path
@@ -1,9 +1,11 @@
 from stats.mongo import server_metrics
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import time
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.dates as mdates
 import math
-from datetime import timezone
+import io
+import threading
 
 
 DEFAULT_PUSH_INTERVAL_SECONDS = 10
@@ -24,18 +26,76 @@ def _label(metric: str) -> str:
     return metric.replace("_", " ").title()
 
 
-def plot_metric(metric, minutes=60, ylabel=None, scale=1.0, clamp=None):
-    """
-    Plot for provided metric.
+def _style_axes(ax):
+    ax.set_facecolor(AX_BG)
+    ax.tick_params(
+        colors=TEXT_COLOR,
+        labelsize=9,
+        length=0,
+    )
 
-    Args:
-        metric: The datatype to plot
-        minutes: How far back to plot
-        ylabel: The metric label
-        scale: Normaliziing factor
-        clamp: Minimum and maximum values on Y axis
+    for spine in ax.spines.values():
+        spine.set_color(GRID_COLOR)
+        spine.set_linewidth(1.0)
+
+
+def _build_template():
+    """
+    Build the styled metric figure once. Requests only swap in new data and
+    labels, so styling, layout and artist creation are not repeated.
     """
+    fig = Figure(figsize=(9, 4.5), dpi=140, facecolor=DARK_BG)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    _style_axes(ax)
 
+    ax.grid(
+        True,
+        linestyle="--",
+        linewidth=0.6,
+        color=GRID_COLOR,
+        alpha=0.45,
+    )
+    ax.set_xlabel("Time", color=TEXT_COLOR, labelpad=8)
+    ax.xaxis_date()
+
+    (glow,) = ax.plot([], [], color="#FF8C2A", linewidth=5.0, zorder=1)
+    (line,) = ax.plot(
+        [],
+        [],
+        color=LINE_COLOR,
+        linewidth=2.8,
+        solid_capstyle="round",
+        zorder=3,
+    )
+    title = ax.set_title(
+        "",
+        color=TEXT_COLOR,
+        fontsize=12,
+        pad=12,
+        loc="left",
+        fontweight="bold",
+    )
+
+    # Fixed margins instead of tight_layout/bbox_inches="tight" per render.
+    fig.subplots_adjust(left=0.09, right=0.97, top=0.9, bottom=0.12)
+
+    return {
+        "fig": fig,
+        "canvas": canvas,
+        "ax": ax,
+        "line": line,
+        "glow": glow,
+        "title": title,
+        "fill": None,
+    }
+
+
+_template = None
+_render_lock = threading.Lock()
+
+
+def _fetch(metric, minutes, scale, clamp):
     since = datetime.utcnow() - timedelta(minutes=minutes)
 
     cursor = server_metrics.find(
@@ -67,65 +127,98 @@ def plot_metric(metric, minutes=60, ylabel=None, scale=1.0, clamp=None):
         values.append(val)
         last_ts = ts
 
+    return times, values
+
+
+def plot_metric(metric, minutes=60, ylabel=None, scale=1.0, clamp=None):
+    """
+    Plot for provided metric.
+
+    Args:
+        metric: The datatype to plot
+        minutes: How far back to plot
+        ylabel: The metric label
+        scale: Normaliziing factor
+        clamp: Minimum and maximum values on Y axis
+
+    Returns:
+        bytes | None: PNG data, or None if there is no data in range.
+    """
+    global _template
+
+    times, values = _fetch(metric, minutes, scale, clamp)
     if not times:
         return None
 
-    clean_times = []
-    clean_values = []
-    baseline = []
+    x = mdates.date2num(times)
 
-    for t, v in zip(times, values):
-        clean_times.append(t)
-        clean_values.append(v)
-        baseline.append(0.0)
+    # The template is shared, so renders are serialised; the query above is not.
+    with _render_lock:
+        if _template is None:
+            _template = _build_template()
+        t = _template
+        ax = t["ax"]
 
-    fig, ax = plt.subplots(figsize=(9, 4.5))
-    fig.patch.set_facecolor(DARK_BG)
-    ax.set_facecolor(AX_BG)
+        t["line"].set_data(x, values)
+        t["glow"].set_data(x, values)
 
-    ax.plot(
-        times,
-        values,
-        color=LINE_COLOR,
-        linewidth=2.8,
-        solid_capstyle="round",
-        zorder=3,
-    )
+        if t["fill"] is not None:
+            t["fill"].remove()
+        t["fill"] = ax.fill_between(
+            x,
+            values,
+            0,
+            where=[not math.isnan(v) for v in values],
+            color=FILL_COLOR,
+            alpha=0.90,
+            interpolate=False,
+            zorder=2,
+        )
 
-    ax.fill_between(
-        times,
-        values,
-        0,
-        where=[not math.isnan(v) for v in values],
-        color=FILL_COLOR,
-        alpha=0.90,
-        interpolate=False,
-        zorder=2,
-    )
+        ax.set_ylabel(ylabel or _label(metric), color=TEXT_COLOR, labelpad=8)
+        t["title"].set_text(f"{_label(metric)} · last {minutes} min")
 
-    ax.grid(
-        True,
-        linestyle="--",
-        linewidth=0.6,
-        color=GRID_COLOR,
-        alpha=0.45,
-    )
+        ax.relim()
+        ax.update_datalim([(x[0], 0.0)])  # keep the filled baseline in view
+        ax.autoscale_view()
 
-    ax.set_xlabel("Time", color=TEXT_COLOR, labelpad=8)
-    ax.set_ylabel(ylabel or _label(metric), color=TEXT_COLOR, labelpad=8)
+        buf = io.BytesIO()
+        t["canvas"].print_png(buf)
 
-    ax.tick_params(
-        colors=TEXT_COLOR,
-        labelsize=9,
-        length=0,
-    )
+    return buf.getvalue()
 
-    for spine in ax.spines.values():
-        spine.set_color(GRID_COLOR)
-        spine.set_linewidth(1.0)
+
+DAY_LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def plot_heatmap(values, title):
+    """
+    Plot a 7x24 hour-of-week heatmap.
+
+    Args:
+        values: 168 values, Monday 00:00 first.
+        title: Plot title
+
+    Returns:
+        bytes: PNG data
+    """
+    grid = [values[day * 24 : (day + 1) * 24] for day in range(7)]
+
+    fig = Figure(figsize=(11, 4), dpi=140, facecolor=DARK_BG)
+    canvas = FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    _style_axes(ax)
+
+    image = ax.imshow(grid, aspect="auto", cmap="inferno", interpolation="nearest")
+
+    ax.set_yticks(range(7))
+    ax.set_yticklabels(DAY_LABELS)
+    ax.set_xticks(range(0, 24, 2))
+    ax.set_xticklabels([f"{h:02d}" for h in range(0, 24, 2)])
+    ax.set_xlabel("Hour", color=TEXT_COLOR, labelpad=8)
 
     ax.set_title(
-        f"{_label(metric)} · last {minutes} min",
+        title,
         color=TEXT_COLOR,
         fontsize=12,
         pad=12,
@@ -133,23 +226,13 @@ def plot_metric(metric, minutes=60, ylabel=None, scale=1.0, clamp=None):
         fontweight="bold",
     )
 
-    ax.plot(
-        times,
-        values,
-        color="#FF8C2A",
-        linewidth=5.0,
-        zorder=1,
-    )
+    bar = fig.colorbar(image, ax=ax, pad=0.02)
+    bar.ax.tick_params(colors=TEXT_COLOR, labelsize=8, length=0)
+    bar.outline.set_edgecolor(GRID_COLOR)
 
-    plt.tight_layout()
+    fig.tight_layout()
 
-    path = f"/tmp/{metric}_{int(time.time())}.png"
-    plt.savefig(
-        path,
-        dpi=140,
-        facecolor=fig.get_facecolor(),
-        bbox_inches="tight",
-    )
-    plt.close(fig)
+    buf = io.BytesIO()
+    canvas.print_png(buf)
 
-    return path
+    return buf.getvalue()
@@ -0,0 +1,64 @@
+from stats.mongo import server_metrics
+from pymongo.errors import OperationFailure, PyMongoError
+import time
+
+
+TAIL_INTERVAL_SECONDS = 10
+RETRY_SECONDS = 5
+
+
+def _tail(collection, on_doc, stop, last_ts):
+    """
+    Fallback for standalone servers: poll for documents newer than the last
+    timestamp seen. Uses the `timestamp` index, so each poll is one seek.
+    """
+    while not stop.is_set():
+        query = {"timestamp": {"$gt": last_ts}} if last_ts else {}
+        try:
+            for doc in collection.find(query).sort("timestamp", 1).limit(100):
+                on_doc(doc)
+                last_ts = doc["timestamp"]
+        except PyMongoError as e:
+            print(f"[STATS] Tail poll failed: {type(e).__name__}")
+            stop.wait(RETRY_SECONDS)
+            continue
+        stop.wait(TAIL_INTERVAL_SECONDS)
+
+
+def watch_metrics(on_doc, stop, collection=server_metrics):
+    """
+    Call `on_doc` for every new `server_metrics` document until `stop` is set.
+    Blocking; run it in a daemon thread.
+
+    Uses a change stream, which needs a replica set. To try it locally, start
+    a single-node set (`mongod --replSet rs0`, then `rs.initiate()` in
+    mongosh) and point `MONGO_URI` at it with `?replicaSet=rs0`. On a
+    standalone server, it falls back to tailing the newest timestamp.
+
+    Args:
+        on_doc: Callable taking the inserted document. Called from this thread.
+        stop: threading.Event that ends the watch.
+        collection: Collection to watch.
+    """
+    latest = collection.find_one(sort=[("timestamp", -1)])
+    if latest:
+        on_doc(latest)
+    last_ts = latest["timestamp"] if latest else None
+
+    while not stop.is_set():
+        try:
+            pipeline = [{"$match": {"operationType": "insert"}}]
+            with collection.watch(pipeline, max_await_time_ms=1000) as stream:
+                print("[STATS] Watching server_metrics change stream")
+                while not stop.is_set() and stream.alive:
+                    change = stream.try_next()
+                    if change is not None:
+                        on_doc(change["fullDocument"])
+                        last_ts = change["fullDocument"].get("timestamp", last_ts)
+        except OperationFailure as e:
+            print(f"[STATS] Change streams unavailable ({e.code}), tailing instead")
+            _tail(collection, on_doc, stop, last_ts)
+            return
+        except PyMongoError as e:
+            print(f"[STATS] Change stream interrupted: {type(e).__name__}")
+            time.sleep(RETRY_SECONDS)
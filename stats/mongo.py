@@ -10,3 +10,10 @@ db = client[MONGO_DB]
 server_metrics = db.server_metrics
 players = db.players
 duels_db = db.duels
+activity_stats = db.activity_stats
+prewarm_events = db.prewarm_events
+boot_timings = db.boot_timings
+shutdown_timings = db.shutdown_timings
+player_baselines = db.player_baselines
+player_deltas = db.player_deltas
+bot_state = db.bot_state
@@ -0,0 +1,113 @@
+from stats.mongo import prewarm_events
+from stats.activity import (
+    UTC_OFFSET,
+    _local,
+    bucket_of,
+    demand_probability,
+    weeks_observed,
+)
+from datetime import datetime, timedelta
+
+
+def next_slot(acc, now, lead_minutes, threshold, min_weeks):
+    """
+    Decide whether the VM should be pre-warmed for the upcoming hour.
+
+    A slot is only considered once the next hour-of-week bucket starts within
+    `lead_minutes`, so the VM comes up just before demand instead of idling
+    for the whole hour.
+
+    Args:
+        acc: Accumulator from `stats.activity.update_activity`.
+        now: Current naive UTC time.
+        lead_minutes: How long before the hour to start the VM.
+        threshold: Minimum demand probability for the upcoming bucket.
+        min_weeks: Minimum weeks of history before predicting at all.
+
+    Returns:
+        tuple: (slot start or None, probability or None)
+    """
+    target = now + timedelta(minutes=lead_minutes)
+    if bucket_of(target) == bucket_of(now):
+        return None, None
+    if weeks_observed(acc) < min_weeks:
+        return None, None
+
+    probability = demand_probability(acc, bucket_of(target))
+    if probability is None or probability < threshold:
+        return None, probability
+
+    # Buckets are local hours, which do not start on the UTC hour.
+    slot = _local(target).replace(minute=0, second=0, microsecond=0) - UTC_OFFSET
+    return slot, probability
+
+
+def record_prewarm(server, slot, probability):
+    """
+    Store a pre-warm start so its outcome can be resolved later.
+
+    Returns:
+        ObjectId: The event id.
+    """
+    result = prewarm_events.insert_one(
+        {
+            "server": server,
+            "slot": slot,
+            "bucket": bucket_of(slot),
+            "probability": probability,
+            "started_at": datetime.utcnow(),
+            "outcome": None,
+        }
+    )
+    return result.inserted_id
+
+
+def resolve_prewarm(event_id, hit, started_at):
+    """
+    Mark a pre-warm as a hit (a player joined before the grace period ran
+    out) or a miss, along with the VM minutes it spent without players.
+    """
+    now = datetime.utcnow()
+    prewarm_events.update_one(
+        {"_id": event_id},
+        {
+            "$set": {
+                "outcome": "hit" if hit else "miss",
+                "resolved_at": now,
+                "idle_vm_minutes": (now - started_at).total_seconds() / 60,
+            }
+        },
+    )
+
+
+def prewarm_report(days=30):
+    """
+    Summarise pre-warm effectiveness over the last `days` days.
+
+    Returns:
+        dict: hits, misses, hit_rate, extra_vm_minutes
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    rows = prewarm_events.aggregate(
+        [
+            {"$match": {"started_at": {"$gte": since}, "outcome": {"$ne": None}}},
+            {
+                "$group": {
+                    "_id": "$outcome",
+                    "count": {"$sum": 1},
+                    "minutes": {"$sum": "$idle_vm_minutes"},
+                }
+            },
+        ]
+    )
+
+    totals = {row["_id"]: row for row in rows}
+    hits = totals.get("hit", {}).get("count", 0)
+    misses = totals.get("miss", {}).get("count", 0)
+    resolved = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": (hits / resolved) if resolved else None,
+        "extra_vm_minutes": sum(row["minutes"] for row in totals.values()),
+    }
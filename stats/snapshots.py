@@ -0,0 +1,182 @@
+from stats.mongo import players, player_baselines, player_deltas
+from stats.activity import UTC_OFFSET
+from pymongo import UpdateOne
+from datetime import datetime, timedelta
+import threading
+import time
+
+
+# Lifetime counters on `players` docs that are tracked as daily deltas.
+COUNTERS = [
+    "total_playtime_ms",
+    "total_joins",
+    "total_deaths",
+    "player_kills",
+    "mob_kills",
+    "blocks_broken",
+    "blocks_placed",
+    "villager_trades",
+    "animals_bred",
+    "advancements",
+    "messages_sent",
+]
+
+META_ID = "__meta__"
+BATCH_SIZE = 500
+# Overlap between runs, so a player seen just before the last run is rechecked.
+SEEN_SLACK_MS = 10 * 60 * 1000
+
+_snapshot_lock = threading.Lock()
+_indexes_ready = False
+
+
+def day_key(ts):
+    """
+    Server-local calendar day (`YYYY-MM-DD`) for a naive UTC datetime.
+    """
+    return (ts + UTC_OFFSET).strftime("%Y-%m-%d")
+
+
+def _ensure_indexes():
+    global _indexes_ready
+    if not _indexes_ready:
+        player_deltas.create_index([("uuid", 1), ("day", 1)], unique=True)
+        player_deltas.create_index("day")
+        _indexes_ready = True
+
+
+def _flush(batch, day, now_ms):
+    baselines = {
+        doc["_id"]: doc
+        for doc in player_baselines.find({"_id": {"$in": [p["uuid"] for p in batch]}})
+    }
+
+    delta_ops = []
+    baseline_ops = []
+    for doc in batch:
+        current = {key: doc.get(key, 0) or 0 for key in COUNTERS}
+        base = baselines.get(doc["uuid"])
+
+        if base is not None:
+            # Negative deltas mean a counter was reset; skip rather than subtract.
+            deltas = {
+                key: current[key] - base.get(key, 0)
+                for key in COUNTERS
+                if current[key] > base.get(key, 0)
+            }
+            if not deltas:
+                continue
+            delta_ops.append(
+                UpdateOne(
+                    {"uuid": doc["uuid"], "day": day},
+                    {
+                        "$inc": {f"deltas.{k}": v for k, v in deltas.items()},
+                        "$set": {"name": doc.get("name")},
+                    },
+                    upsert=True,
+                )
+            )
+
+        baseline_ops.append(
+            UpdateOne(
+                {"_id": doc["uuid"]},
+                {"$set": {**current, "name": doc.get("name"), "updated_ms": now_ms}},
+                upsert=True,
+            )
+        )
+
+    if delta_ops:
+        player_deltas.bulk_write(delta_ops, ordered=False)
+    if baseline_ops:
+        player_baselines.bulk_write(baseline_ops, ordered=False)
+    return len(delta_ops)
+
+
+def snapshot_players():
+    """
+    Record how much each player's counters grew since the last run, added
+    to one small delta document per player per day. Only players seen
+    online since the last run are read, and only those whose counters moved
+    get a delta. A player's first snapshot only sets their baseline.
+    Blocking; run it in a thread.
+
+    Returns:
+        int: Number of players with new deltas.
+    """
+    with _snapshot_lock:
+        _ensure_indexes()
+        now = datetime.utcnow()
+        # `now` is naive UTC; `.timestamp()` would read it as local time.
+        now_ms = int(time.time() * 1000)
+        day = day_key(now)
+
+        meta = player_baselines.find_one({"_id": META_ID}) or {}
+        last_run_ms = meta.get("last_run_ms")
+        query = {"uuid": {"$exists": True}}
+        if last_run_ms is not None:
+            query["$or"] = [
+                {"online": True},
+                {"last_seen_ts": {"$gte": last_run_ms - SEEN_SLACK_MS}},
+            ]
+
+        projection = {key: 1 for key in COUNTERS}
+        projection.update({"uuid": 1, "name": 1})
+
+        changed = 0
+        batch = []
+        for doc in players.find(query, projection).batch_size(BATCH_SIZE):
+            batch.append(doc)
+            if len(batch) >= BATCH_SIZE:
+                changed += _flush(batch, day, now_ms)
+                batch = []
+        if batch:
+            changed += _flush(batch, day, now_ms)
+
+        player_baselines.update_one(
+            {"_id": META_ID}, {"$set": {"last_run_ms": now_ms}}, upsert=True
+        )
+        return changed
+
+
+def _since_day(days):
+    return day_key(datetime.utcnow() - timedelta(days=days - 1))
+
+
+def player_window(uuid, days):
+    """
+    Sum a player's deltas over the last `days` days (today included).
+
+    Returns:
+        dict: counter -> growth in the window
+    """
+    totals = {}
+    for doc in player_deltas.find(
+        {"uuid": uuid, "day": {"$gte": _since_day(days)}}, {"deltas": 1}
+    ):
+        for key, value in doc.get("deltas", {}).items():
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def leaderboard(counter, days, limit=10):
+    """
+    Players with the largest growth of `counter` over the last `days` days.
+
+    Returns:
+        list[dict]: {"name", "value"} in descending order.
+    """
+    field = f"$deltas.{counter}"
+    rows = player_deltas.aggregate(
+        [
+            {
+                "$match": {
+                    "day": {"$gte": _since_day(days)},
+                    f"deltas.{counter}": {"$gt": 0},
+                }
+            },
+            {"$group": {"_id": "$uuid", "name": {"$last": "$name"}, "value": {"$sum": field}}},
+            {"$sort": {"value": -1}},
+            {"$limit": limit},
+        ]
+    )
+    return [{"name": row["name"], "value": row["value"]} for row in rows]
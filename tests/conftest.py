@@ -0,0 +1,6 @@
+import os
+import sys
+
+# `stats.mongo` builds a client at import time; it never connects unless used.
+os.environ.setdefault("MONGO_DB", "pesu_mc_test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
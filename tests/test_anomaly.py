@@ -0,0 +1,34 @@
+import random
+from datetime import datetime, timedelta
+
+from sim.seed import _metric_doc
+from stats.anomaly import AnomalyDetector
+
+
+def _replay(detector, start, counts):
+    alerts = []
+    for i, players in enumerate(counts):
+        doc = _metric_doc(start + timedelta(seconds=10 * i), i, players)
+        alerts += detector.update(doc)
+    return alerts
+
+
+def test_normal_join_does_not_alert():
+    random.seed(1)
+    detector = AnomalyDetector()
+    counts = [0] * 300 + [2] * 120 + [5] * 120 + [1] * 120
+    assert _replay(detector, datetime(2026, 1, 5), counts) == []
+
+
+def test_cpu_spike_alerts():
+    random.seed(2)
+    detector = AnomalyDetector()
+    start = datetime(2026, 1, 5)
+    assert _replay(detector, start, [0] * 300) == []
+
+    alerts = []
+    for i in range(5):
+        doc = _metric_doc(start + timedelta(seconds=3000 + 10 * i), 300 + i, 0)
+        doc["cpu_system_pct"] = 60.0
+        alerts += detector.update(doc)
+    assert [a["signal"] for a in alerts] == ["cpu_system"]
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta
+
+from idle_policy import IdlePolicy
+
+CFG = {
+    "IDLE_MINUTES": 5,
+    "WINDOWS": [],
+    "JOIN_WINDOW_MINUTES": 30,
+    "JOIN_THRESHOLD": None,
+    "JOIN_EXTEND_MINUTES": 0,
+    "CPU_BUSY_PCT": 70,
+    "CPU_BUSY_MAX_MINUTES": 10,
+    "RESET_SECONDS": 0,
+}
+
+
+def _run(policy, state, start, minutes, cpu):
+    result = None
+    for m in range(minutes + 1):
+        result = policy.evaluate(state, start + timedelta(minutes=m), 0, cpu=cpu)
+    return result
+
+
+def test_busy_cpu_holds_shutdown():
+    policy = IdlePolicy(CFG)
+    shutdown, _ = _run(policy, policy.new_state(), datetime(2026, 1, 5), 10, cpu=95)
+    assert not shutdown
+
+
+def test_busy_cpu_hold_is_capped():
+    policy = IdlePolicy(CFG)
+    shutdown, idle = _run(policy, policy.new_state(), datetime(2026, 1, 5), 15, cpu=95)
+    assert shutdown
+    assert idle == 15 * 60
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from stats.activity import bucket_of
+from stats.prewarm import next_slot
+
+
+def _acc(bucket):
+    # Four weeks of history with players in every week at `bucket`.
+    hits = [0] * 168
+    hits[bucket] = 4
+    return {
+        "first": datetime(2026, 1, 5),
+        "watermark": datetime(2026, 1, 26),
+        "hits": hits,
+    }
+
+
+def test_next_slot_starts_on_the_local_hour():
+    # 15:20 UTC is 20:50 IST; with a 15 minute lead the next local hour is
+    # 21:00 IST, which starts at 15:30 UTC.
+    now = datetime(2026, 1, 26, 15, 20)
+    target_bucket = bucket_of(now + timedelta(minutes=15))
+
+    slot, probability = next_slot(
+        _acc(target_bucket), now, lead_minutes=15, threshold=0.5, min_weeks=2
+    )
+
+    assert slot == datetime(2026, 1, 26, 15, 30)
+    assert bucket_of(slot) == target_bucket
+    assert slot > now
+    assert probability == 1.0
+
+
+def test_next_slot_waits_until_the_lead_window():
+    now = datetime(2026, 1, 26, 15, 0)
+    slot, _ = next_slot(
+        _acc(bucket_of(now) + 1), now, lead_minutes=15, threshold=0.5, min_weeks=2
+    )
+    assert slot is None
@@ -4,6 +4,7 @@ import yaml
 from mcstatus import JavaServer
 import asyncio
 import os
+import time
 
 from google.cloud import compute_v1
 from google.oauth2 import service_account
@@ -11,26 +12,127 @@ import json
 import base64
 import aiohttp
 
+import crafty
+
 load_dotenv()
-with open("config.yaml", "r") as f:
+CONFIG_PATH = os.getenv("CONFIG_PATH", "config.yaml")
+with open(CONFIG_PATH, "r") as f:
     config = yaml.safe_load(f)
 
 ADMIN_ID = config["bot"]["ADMIN_ID"].split(",")
-
-SERVER_IP = config["crafty"]["SERVER_IP"]
-SERVER_ID = config["crafty"]["SERVER_ID"]
+# Guild to register slash commands in directly (instant), or None for global.
+GUILD_ID = config["bot"].get("GUILD_ID")
 
 PROJECT_ID = config["gcp"]["PROJECT_ID"]
 ZONE = config["gcp"]["ZONE"]
-INSTANCE_NAME = config["gcp"]["INSTANCE_NAME"]
+
+
+def load_servers(config):
+    """
+    STACK: Server control
+    Build the table of managed servers from `config.yaml`.
+
+    Each entry under `servers` maps a short name (used in commands) to its
+    GCP instance and Crafty server. Entries may override `ZONE`. If there is
+    no `servers` section, the legacy single `gcp.INSTANCE_NAME` /
+    `crafty.SERVER_ID` pair is used under the name `main`.
+
+    Returns:
+        dict: name -> {"INSTANCE_NAME", "ZONE", "SERVER_ID", "SERVER_IP"}
+    """
+    entries = config.get("servers") or {
+        "main": {
+            "INSTANCE_NAME": config["gcp"]["INSTANCE_NAME"],
+            "SERVER_ID": config["crafty"]["SERVER_ID"],
+            "SERVER_IP": config["crafty"]["SERVER_IP"],
+        }
+    }
+
+    servers = {}
+    for name, entry in entries.items():
+        servers[name.lower()] = {
+            "INSTANCE_NAME": entry["INSTANCE_NAME"],
+            "ZONE": entry.get("ZONE", ZONE),
+            "SERVER_ID": entry["SERVER_ID"],
+            "SERVER_IP": entry["SERVER_IP"],
+        }
+    return servers
+
+
+SERVERS = load_servers(config)
+DEFAULT_SERVER = next(iter(SERVERS))
+
+SERVER_IP = SERVERS[DEFAULT_SERVER]["SERVER_IP"]
+
+PREWARM = {
+    "ENABLED": False,
+    "SERVER": DEFAULT_SERVER,
+    "LEAD_MINUTES": 10,
+    "THRESHOLD": 0.6,
+    "MIN_WEEKS": 2,
+    "GRACE_MINUTES": 20,
+    **(config.get("prewarm") or {}),
+}
+
+# Defaults reproduce the old fixed rule: shut down after one empty minute.
+IDLE_POLICY = {
+    "IDLE_MINUTES": 1,
+    "WINDOWS": [],
+    "JOIN_WINDOW_MINUTES": 30,
+    "JOIN_THRESHOLD": None,
+    "JOIN_EXTEND_MINUTES": 0,
+    "CPU_BUSY_PCT": None,
+    "CPU_BUSY_MAX_MINUTES": 30,
+    "RESET_SECONDS": 0,
+    **(config.get("idle_policy") or {}),
+}
+
+ANOMALY = {
+    "ENABLED": False,
+    "CHANNEL": "minecraft-chat",
+    "Z_THRESHOLD": 4.0,
+    "SUSTAIN_SAMPLES": 3,
+    "SUPPRESS_MINUTES": 15,
+    **(config.get("anomaly") or {}),
+}
+
+STATUS_BOARD = {
+    "ENABLED": False,
+    "CHANNEL": "minecraft-chat",
+    "MIN_EDIT_SECONDS": 10,
+    **(config.get("status_board") or {}),
+}
 
 GOOGLE_SERVICE_ACCOUNT_BASE64 = os.getenv("GOOGLE_SERVICE_ACCOUNT_BASE64")
-CRAFTY_TOKEN = os.getenv("CRAFTY_TOKEN")
 
 
-key_json = json.loads(base64.b64decode(GOOGLE_SERVICE_ACCOUNT_BASE64))
-credentials = service_account.Credentials.from_service_account_info(key_json)
-instances_client = compute_v1.InstancesClient(credentials=credentials)
+_instances_client = None
+
+
+def get_instances_client():
+    """
+    STACK: VM control
+    The Compute Engine client, created on first use so importing this module
+    does not need GCP credentials.
+
+    Returns:
+        compute_v1.InstancesClient (or whatever `set_instances_client` set)
+    """
+    global _instances_client
+    if _instances_client is None:
+        key_json = json.loads(base64.b64decode(GOOGLE_SERVICE_ACCOUNT_BASE64))
+        credentials = service_account.Credentials.from_service_account_info(key_json)
+        _instances_client = compute_v1.InstancesClient(credentials=credentials)
+    return _instances_client
+
+
+def set_instances_client(client):
+    """
+    STACK: VM control
+    Replace the Compute Engine client, e.g. with `sim.fake_compute`.
+    """
+    global _instances_client
+    _instances_client = client
 
 
 def is_admin(ctx):
@@ -40,92 +142,264 @@ def is_admin(ctx):
     in the discord server.
 
     Args:
-        ctx: Message object
+        ctx: Message object, or a `discord.Interaction`
     """
-    for role in ctx.author.roles:
+    member = getattr(ctx, "author", None) or ctx.user
+    for role in getattr(member, "roles", []):
         if str(role.id) in ADMIN_ID:
             return True
 
 
-async def get_player_count():
+def get_server(name=None):
+    """
+    STACK: Server control
+    Resolve a server name from a command argument.
+
+    Args:
+        name: Server name, or None for the default server.
+
+    Returns:
+        str | None: The normalised server name, or None if it is unknown.
+    """
+    if name is None:
+        return DEFAULT_SERVER
+    name = name.lower()
+    return name if name in SERVERS else None
+
+
+async def ping_player_count(server=DEFAULT_SERVER):
     """
     STACK: Server control
     Run blocking mcstatus code in a background thread.
 
+    Args:
+        server: Name of the server to query.
+
     Returns:
         status.players.online: Number of online players.
     """
     try:
 
         def query():
-            server = JavaServer.lookup(SERVER_IP)
-            status = server.status()
+            mc = JavaServer.lookup(SERVERS[server]["SERVER_IP"])
+            status = mc.status()
             return status.players.online
 
         return await asyncio.to_thread(query)
     except TimeoutError:
         pass
     except Exception as e:
-        print(f"[SERVER CONTROL] Error checking server status: {e}")
+        print(f"[SERVER CONTROL] Error checking {server} status: {e}")
         return None
 
 
-async def start_vm():
+async def get_server_stats(server=DEFAULT_SERVER):
+    """
+    STACK: Server control
+    Live stats for a server from the Crafty API.
+
+    Args:
+        server: Name of the server to query.
+
+    Returns:
+        dict | None: See `crafty.get_server_stats`.
+    """
+    return await crafty.get_server_stats(SERVERS[server]["SERVER_ID"])
+
+
+# Servers that have answered a status ping since their VM last came up.
+# Crafty reports the process as running, with 0 players, while the world is
+# still loading, so its counts are only trusted once a ping has succeeded.
+status_confirmed = set()
+
+
+async def get_player_count(server=DEFAULT_SERVER):
+    """
+    STACK: Server control
+    Number of online players. Once the server has answered a status ping,
+    asks Crafty first, since that reuses a pooled connection and needs no
+    handshake with the game server, and falls back to an mcstatus ping when
+    Crafty is unavailable.
+
+    Args:
+        server: Name of the server to query.
+
+    Returns:
+        int | None: Online players, or None if the server is not joinable.
+    """
+    if server not in status_confirmed:
+        count = await ping_player_count(server)
+        if count is not None:
+            status_confirmed.add(server)
+        return count
+
+    stats = await get_server_stats(server)
+    if stats is not None:
+        if not stats["running"]:
+            status_confirmed.discard(server)
+            return None
+        return stats["online"]
+    return await ping_player_count(server)
+
+
+async def start_vm(server=DEFAULT_SERVER):
     """
     STACK: VM control
-    Starts the virtual machine on Google cloud.
+    Sends the start request for the virtual machine on Google cloud. Does
+    not wait for the VM to come up, so callers can record when the request
+    was accepted; wait on the returned operation, then call
+    `invalidate_vm_statuses`.
+
+    Args:
+        server: Name of the server whose VM should be started.
+
+    Returns:
+        The start operation.
     """
-    print(f"[VM CONTROL] Starting {INSTANCE_NAME}")
-    operation = instances_client.start(
-        project=PROJECT_ID, zone=ZONE, instance=INSTANCE_NAME
+    instance = SERVERS[server]["INSTANCE_NAME"]
+    print(f"[VM CONTROL] Starting {instance}")
+    return await asyncio.to_thread(
+        get_instances_client().start,
+        project=PROJECT_ID,
+        zone=SERVERS[server]["ZONE"],
+        instance=instance,
     )
-    operation.result()
-    print("[VM CONTROL] VM started")
 
 
-async def stop_vm():
+async def stop_vm(server=DEFAULT_SERVER):
     """
     STACK: VM control
     Stops the virtual machine on Google cloud.
+
+    Args:
+        server: Name of the server whose VM should be stopped.
     """
-    print(f"[VM CONTROL] Stopping {INSTANCE_NAME}...")
+    instance = SERVERS[server]["INSTANCE_NAME"]
+    print(f"[VM CONTROL] Stopping {instance}...")
 
     def send_command():
-        operation = instances_client.stop(
-            project=PROJECT_ID, zone=ZONE, instance=INSTANCE_NAME
+        operation = get_instances_client().stop(
+            project=PROJECT_ID, zone=SERVERS[server]["ZONE"], instance=instance
         )
         operation.result()
 
-    result = await asyncio.to_thread(send_command)
-    print("[VM CONTROL] VM stopped.")
+    await asyncio.to_thread(send_command)
+    invalidate_vm_statuses()
+    status_confirmed.discard(server)
+    print(f"[VM CONTROL] {instance} stopped.")
 
 
-async def get_vm_status():
+# Name -> status snapshot shared by every status read. It is refreshed at
+# most once per `VM_STATUS_TTL_SECONDS`, with one `list` call per zone.
+VM_STATUS_TTL_SECONDS = 10
+vm_status_snapshot = {"statuses": {}, "fetched_at": 0.0}
+_snapshot_lock = asyncio.Lock()
+
+
+def _list_zone_statuses(zone, instance_names):
     """
     STACK: VM control
-    Fetches the status of the virtual machine on Google cloud.
+    Blocking helper: fetch the status of several instances in one zone with a
+    single filtered `list` call.
+
+    Returns:
+        dict: instance name -> status
     """
-    instance = instances_client.get(
-        project=PROJECT_ID, zone=ZONE, instance=INSTANCE_NAME
+    name_filter = " OR ".join(f'(name = "{name}")' for name in instance_names)
+    pager = get_instances_client().list(
+        request={"project": PROJECT_ID, "zone": zone, "filter": name_filter}
     )
-    return instance.status
+    return {instance.name: instance.status for instance in pager}
+
 
+async def refresh_vm_statuses():
+    """
+    STACK: VM control
+    Rebuild the status snapshot for every managed virtual machine. Costs one
+    API round-trip per zone, and the zones are queried concurrently.
+
+    Returns:
+        dict: server name -> instance status (None if unknown or failed)
+    """
+    by_zone = {}
+    for name, server in SERVERS.items():
+        by_zone.setdefault(server["ZONE"], []).append(server["INSTANCE_NAME"])
+
+    zones = list(by_zone)
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_list_zone_statuses, z, by_zone[z]) for z in zones),
+        return_exceptions=True,
+    )
 
-async def stop_mc_server():
+    by_instance = {}
+    for zone, result in zip(zones, results):
+        if isinstance(result, Exception):
+            print(f"[VM CONTROL] Failed to list instances in {zone}: {result}")
+            continue
+        for instance, status in result.items():
+            by_instance[(zone, instance)] = status
+
+    statuses = {
+        name: by_instance.get((server["ZONE"], server["INSTANCE_NAME"]))
+        for name, server in SERVERS.items()
+    }
+    for name, status in statuses.items():
+        if status is not None and status != "RUNNING":
+            status_confirmed.discard(name)
+    vm_status_snapshot["statuses"] = statuses
+    vm_status_snapshot["fetched_at"] = time.monotonic()
+    return statuses
+
+
+def invalidate_vm_statuses():
+    """
+    STACK: VM control
+    Drop the status snapshot so the next read fetches fresh data. Called
+    after start/stop operations change an instance's state.
+    """
+    vm_status_snapshot["fetched_at"] = 0.0
+
+
+async def get_vm_statuses():
+    """
+    STACK: VM control
+    Returns the status snapshot for every managed virtual machine, refreshing
+    it first if it is older than `VM_STATUS_TTL_SECONDS`. Concurrent callers
+    share a single refresh.
+
+    Returns:
+        dict: server name -> instance status (None if unknown or failed)
+    """
+    async with _snapshot_lock:
+        age = time.monotonic() - vm_status_snapshot["fetched_at"]
+        if age >= VM_STATUS_TTL_SECONDS:
+            await refresh_vm_statuses()
+        return vm_status_snapshot["statuses"]
+
+
+async def get_vm_status(server=DEFAULT_SERVER):
+    """
+    STACK: VM control
+    Fetches the status of the virtual machine on Google cloud from the
+    shared snapshot.
+
+    Args:
+        server: Name of the server to look up.
+    """
+    statuses = await get_vm_statuses()
+    return statuses.get(server)
+
+
+async def stop_mc_server(server=DEFAULT_SERVER):
     """
     STACK: Server control
-    Stops the minecraft server on the VM. Requires `CRAFTY_TOKEN` and `SERVER_ID` in `.env`.
-    """
-    headers = {"Authorization": f"{CRAFTY_TOKEN}", "Content-Type": "application/json"}
-    url = f"https://pesu-mc.ddns.net:8443/api/v2/servers/{SERVER_ID}/action/stop_server"
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, headers=headers, ssl=False) as resp:
-            text = await resp.text()
-            print(f"[SERVER CONTROL] Shutdown Response {resp.status}: {text}")
-            if resp.status != 200:
-                raise Exception(
-                    f"[SERVER CONTROL] Failed to shutdown server: {resp.status}"
-                )
+    Stops the minecraft server on the VM. Requires `CRAFTY_TOKEN` in `.env`
+    and the server's `SERVER_ID` in `config.yaml`.
+
+    Args:
+        server: Name of the server to stop.
+    """
+    await crafty.server_action(SERVERS[server]["SERVER_ID"], "stop_server")
 
 
 def format_duration(ms):
@@ -1,12 +1,67 @@
-from flask import Flask
+from flask import Flask, Response, abort, request, send_file
+import itertools
+import os
+
+from stats.export import EXPORTS, FORMATS, parse_range, iter_csv_gz, export_to_file
 
 app = Flask(__name__)
 
+EXPORT_TOKEN = os.getenv("EXPORT_TOKEN")
+
 
 @app.route("/")
 def home():
     return "[HOST] Bot is online"
 
 
+@app.route("/export/<collection>")
+def export(collection):
+    """
+    Stream a collection as gzip CSV (default) or Parquet.
+    Requires the `x-export-token` header to match `EXPORT_TOKEN`.
+
+    Query params:
+        range: e.g. `24h`, `7d` or `all` (default: everything)
+        format: `csv` or `parquet`
+    """
+    if not EXPORT_TOKEN or request.headers.get("x-export-token") != EXPORT_TOKEN:
+        abort(403)
+    if collection not in EXPORTS:
+        abort(404)
+
+    fmt = request.args.get("format", "csv")
+    if fmt not in FORMATS:
+        abort(400)
+    try:
+        span = parse_range(request.args.get("range"))
+    except ValueError:
+        abort(400)
+
+    if fmt == "csv":
+        chunks = iter_csv_gz(collection, span)
+        first = next(chunks, None)
+        if first is None:
+            return Response(status=204)
+        return Response(
+            itertools.chain([first], chunks),
+            mimetype="application/gzip",
+            headers={
+                "Content-Disposition": f"attachment; filename={collection}.csv.gz"
+            },
+        )
+
+    # Parquet needs a seekable file for its footer, so spool to disk first.
+    try:
+        path = export_to_file(collection, span, fmt)
+    except RuntimeError:
+        abort(501)
+    if path is None:
+        return Response(status=204)
+
+    response = send_file(path, as_attachment=True, download_name=f"{collection}.parquet")
+    response.call_on_close(lambda: os.remove(path))
+    return response
+
+
 def run_webserver():
     app.run(host="0.0.0.0", port=7860)